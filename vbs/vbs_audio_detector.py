@@ -12,22 +12,16 @@ from datetime import datetime
 from typing import Optional, Callable, Dict, Any
 import traceback
 
-# Try to import audio libraries
+# Try to import audio libraries (spectral detection uses numpy's rfft - no SciPy needed)
 try:
     import pyaudio
     import numpy as np
-    from scipy import signal
     AUDIO_LIBS_AVAILABLE = True
-    SCIPY_AVAILABLE = True
-except ImportError as e:
-    try:
-        import pyaudio
-        import numpy as np
-        AUDIO_LIBS_AVAILABLE = True
-        SCIPY_AVAILABLE = False
-    except ImportError:
-        AUDIO_LIBS_AVAILABLE = False
-        SCIPY_AVAILABLE = False
+except ImportError:
+    AUDIO_LIBS_AVAILABLE = False
+
+# Number of chunks kept in the capture ring buffer (~0.75s at 512 samples / 44.1 kHz)
+RING_CHUNKS = 64
 
 class EnhancedVBSAudioDetector:
     """Enhanced audio detection system optimized for clicks, pops, and short sounds"""
@@ -69,6 +63,7 @@ class EnhancedVBSAudioDetector:
         # Detection state
         self.is_detecting = False
         self.success_detected = False
+        self._success_event = threading.Event()  # set alongside success_detected - lets callers block instead of poll
         self.detection_timestamp = None
         self.success_callback = None
         self.detection_count = 0
@@ -83,12 +78,24 @@ class EnhancedVBSAudioDetector:
         self.stream = None
         self.detection_thread = None
         
+        # Capture ring buffer - filled by the stream callback, read by the detection worker.
+        # Preallocated once; the stream stays open across detection sessions.
+        self._ring = np.zeros((RING_CHUNKS, self.config["chunk_size"]), dtype=np.int16) if AUDIO_LIBS_AVAILABLE else None
+        self._ring_head = 0  # total chunks written since the stream opened
+        self._ring_ready = threading.Event()
+        
+        # Spectral detection: window and popup-band mask precomputed once for the fixed chunk size
+        if AUDIO_LIBS_AVAILABLE:
+            chunk = self.config["chunk_size"]
+            freqs = np.fft.rfftfreq(chunk, 1.0 / self.config["sample_rate"])
+            self._fft_window = np.hanning(chunk).astype(np.float32)
+            self._popup_band = (freqs >= self.config["min_popup_frequency"]) & (freqs <= self.config["max_popup_frequency"])
+        
         # Fallback detection
         self.fallback_mode = not AUDIO_LIBS_AVAILABLE
         
         self.logger.info(f"🔊 Enhanced VBS Audio Detector initialized")
         self.logger.info(f"   Audio libs: {'Available' if AUDIO_LIBS_AVAILABLE else 'Fallback mode'}")
-        self.logger.info(f"   SciPy: {'Available' if SCIPY_AVAILABLE else 'Not available'}")
     
     def _setup_logging(self) -> logging.Logger:
         """Setup enhanced logging"""
@@ -206,8 +213,7 @@ class EnhancedVBSAudioDetector:
                 "method": "audio",
                 "device": default_device['name'],
                 "sample_rate": self.config["sample_rate"],
-                "background_noise": self.background_noise_level,
-                "scipy_available": SCIPY_AVAILABLE
+                "background_noise": self.background_noise_level
             }
             
         except Exception as e:
@@ -248,14 +254,13 @@ class EnhancedVBSAudioDetector:
             # Method 4: Enhanced Spectral Detection for POPUP sounds
             spectral_detected = False
             spectral_score = 0.0
-            if self.config["use_spectral_detection"] and SCIPY_AVAILABLE:
+            if self.config["use_spectral_detection"] and len(normalized_audio) == len(self._fft_window):
                 try:
-                    # Analyze frequency content for popup-specific characteristics
-                    freqs, psd = signal.welch(normalized_audio, self.config["sample_rate"], nperseg=min(256, len(normalized_audio)))
+                    # Analyze frequency content for popup-specific characteristics - one windowed FFT per chunk
+                    psd = np.abs(np.fft.rfft(normalized_audio * self._fft_window)) ** 2
                     
                     # Focus on popup frequency range (800Hz - 8kHz)
-                    popup_freq_mask = (freqs >= self.config["min_popup_frequency"]) & (freqs <= self.config["max_popup_frequency"])
-                    popup_energy = np.sum(psd[popup_freq_mask])
+                    popup_energy = np.sum(psd[self._popup_band])
                     
                     # Look for sustained energy in popup frequency range
                     total_energy = np.sum(psd)
@@ -308,23 +313,53 @@ class EnhancedVBSAudioDetector:
             self.logger.warning(f"⚠️ Popup detection error: {e}")
             return False, 0.0, "Error"
     
-    def _audio_detection_worker(self, timeout: Optional[float] = None):
-        """Enhanced audio detection worker thread"""
-        try:
-            self.logger.info("🎧 Enhanced audio detection worker started")
-            
-            # Open audio stream with smaller buffer for better responsiveness
+    def _stream_callback(self, in_data, frame_count, time_info, status):
+        """PyAudio callback - copy the captured chunk into the next ring slot"""
+        samples = np.frombuffer(in_data, dtype=np.int16)
+        slot = self._ring[self._ring_head % RING_CHUNKS]
+        n = min(len(samples), len(slot))
+        slot[:n] = samples[:n]
+        slot[n:] = 0
+        self._ring_head += 1
+        self._ring_ready.set()
+        return (None, pyaudio.paContinue)
+    
+    def _ensure_stream(self):
+        """Open the continuous callback-driven input stream once"""
+        if self.stream is None:
             self.stream = self.audio_system.open(
                 format=self.config["format"],
                 channels=self.config["channels"],
                 rate=self.config["sample_rate"],
                 input=True,
-                frames_per_buffer=self.config["chunk_size"]
+                frames_per_buffer=self.config["chunk_size"],
+                stream_callback=self._stream_callback
             )
+            self.stream.start_stream()
+        return self.stream
+    
+    def _close_stream(self):
+        """Close the continuous input stream"""
+        if self.stream:
+            try:
+                self.stream.stop_stream()
+                self.stream.close()
+            except Exception:
+                pass
+            self.stream = None
+    
+    def _audio_detection_worker(self, timeout: Optional[float] = None):
+        """Enhanced audio detection worker thread"""
+        try:
+            self.logger.info("🎧 Enhanced audio detection worker started")
+            
+            # Continuous stream feeds the ring buffer; only chunks captured from now on are analysed
+            self._ensure_stream()
+            read_pos = self._ring_head
+            chunk_seconds = self.config["chunk_size"] / self.config["sample_rate"]
             
             start_time = time.time()
-            sound_start_time = None
-            sound_chunks = []
+            sound_chunk_count = 0
             detection_active = False
             
             while self.is_detecting:
@@ -338,10 +373,18 @@ class EnhancedVBSAudioDetector:
                     self.logger.info("🔔 Success already detected, exiting worker")
                     break
                 
-                try:
-                    # Read audio data
-                    data = self.stream.read(self.config["chunk_size"], exception_on_overflow=False)
-                    audio_data = np.frombuffer(data, dtype=np.int16)
+                # Block until the callback delivers new chunks
+                if not self._ring_ready.wait(0.1):
+                    continue
+                self._ring_ready.clear()
+                
+                head = self._ring_head
+                if head - read_pos > RING_CHUNKS - 1:
+                    read_pos = head - (RING_CHUNKS - 1)  # worker fell behind - skip overwritten chunks
+                
+                while read_pos < head and self.is_detecting:
+                    audio_data = self._ring[read_pos % RING_CHUNKS]
+                    read_pos += 1
                     
                     # Detect click/pop
                     detected, score, method = self._detect_click_pop(audio_data)
@@ -349,43 +392,34 @@ class EnhancedVBSAudioDetector:
                     if detected:
                         if not detection_active:
                             # Start of new detection
-                            sound_start_time = time.time()
                             detection_active = True
-                            sound_chunks = [audio_data]
+                            sound_chunk_count = 1
                             self.logger.info(f"🔍 Sound detected (Method: {method}, Score: {score:.4f})")
                         else:
                             # Continue existing detection
-                            sound_chunks.append(audio_data)
-                    else:
-                        if detection_active:
-                            # Check if we have a valid detection duration
-                            sound_duration = time.time() - sound_start_time
-                            
-                            if (self.config["min_duration"] <= sound_duration <= self.config["max_duration"]):
-                                # Valid popup sound detected!
-                                self.detection_count += 1
-                                self.logger.info(f"🔔 POPUP SOUND #{self.detection_count} detected! Duration: {sound_duration:.3f}s")
-                                self.logger.info(f"   Detection criteria met: {method}")
-                                self.logger.info(f"   Sound duration: {sound_duration:.3f}s (range: {self.config['min_duration']:.3f}s - {self.config['max_duration']:.3f}s)")
-                                self._trigger_success_detection()
-                                # Exit immediately after successful detection
-                                break
+                            sound_chunk_count += 1
+                    elif detection_active:
+                        # Check if we have a valid detection duration (measured in captured audio, not wall time)
+                        sound_duration = sound_chunk_count * chunk_seconds
+                        
+                        if (self.config["min_duration"] <= sound_duration <= self.config["max_duration"]):
+                            # Valid popup sound detected!
+                            self.detection_count += 1
+                            self.logger.info(f"🔔 POPUP SOUND #{self.detection_count} detected! Duration: {sound_duration:.3f}s")
+                            self.logger.info(f"   Detection criteria met: {method}")
+                            self.logger.info(f"   Sound duration: {sound_duration:.3f}s (range: {self.config['min_duration']:.3f}s - {self.config['max_duration']:.3f}s)")
+                            self._trigger_success_detection()
+                            # Exit immediately after successful detection
+                            break
+                        else:
+                            # Invalid duration, reset
+                            if sound_duration < self.config["min_duration"]:
+                                self.logger.debug(f"🔇 Sound too short: {sound_duration:.3f}s")
                             else:
-                                # Invalid duration, reset
-                                if sound_duration < self.config["min_duration"]:
-                                    self.logger.debug(f"🔇 Sound too short: {sound_duration:.3f}s")
-                                else:
-                                    self.logger.debug(f"🔇 Sound too long: {sound_duration:.3f}s")
-                            
-                            detection_active = False
-                            sound_chunks = []
-                    
-                    # Minimal delay for maximum responsiveness
-                    time.sleep(0.001)  # 1ms delay for maximum responsiveness
-                    
-                except Exception as e:
-                    self.logger.warning(f"⚠️ Audio read error: {e}")
-                    time.sleep(0.1)
+                                self.logger.debug(f"🔇 Sound too long: {sound_duration:.3f}s")
+                        
+                        detection_active = False
+                        sound_chunk_count = 0
             
             # Ensure detection is stopped when worker exits
             self.is_detecting = False
@@ -394,13 +428,6 @@ class EnhancedVBSAudioDetector:
             self.logger.error(f"❌ Enhanced audio detection worker failed: {e}")
             self.is_detecting = False
         finally:
-            if self.stream:
-                try:
-                    self.stream.stop_stream()
-                    self.stream.close()
-                except:
-                    pass
-                self.stream = None
             self.logger.info("🎧 Enhanced audio detection worker finished")
     
     def start_detection(self, success_callback: Optional[Callable] = None, timeout: Optional[float] = None) -> bool:
@@ -412,6 +439,7 @@ class EnhancedVBSAudioDetector:
             
             self.success_callback = success_callback
             self.success_detected = False
+            self._success_event.clear()
             self.detection_timestamp = None
             self.detection_count = 0
             self.is_detecting = True
@@ -448,13 +476,7 @@ class EnhancedVBSAudioDetector:
             
             self.is_detecting = False
             
-            # Close audio stream if active
-            if self.stream:
-                self.stream.stop_stream()
-                self.stream.close()
-                self.stream = None
-            
-            # Wait for detection thread to finish
+            # Wait for detection thread to finish (the capture stream stays open for the next session)
             if self.detection_thread and self.detection_thread.is_alive():
                 self.detection_thread.join(timeout=2.0)
             
@@ -500,6 +522,7 @@ class EnhancedVBSAudioDetector:
         """Trigger success detection event"""
         try:
             self.success_detected = True
+            self._success_event.set()
             self.detection_timestamp = datetime.now()
             self.is_detecting = False
             
@@ -546,6 +569,7 @@ class EnhancedVBSAudioDetector:
             
             # Reset detection state for fresh popup detection
             self.success_detected = False
+            self._success_event.clear()
             self.detection_timestamp = None
             
             if not self.start_detection(timeout=timeout):
@@ -608,7 +632,6 @@ class EnhancedVBSAudioDetector:
             "detection_timestamp": self.detection_timestamp.isoformat() if self.detection_timestamp else None,
             "fallback_mode": self.fallback_mode,
             "audio_available": AUDIO_LIBS_AVAILABLE,
-            "scipy_available": SCIPY_AVAILABLE,
             "background_noise_level": self.background_noise_level,
             "calibration_complete": self.calibration_complete,
             "config": self.config
@@ -618,6 +641,7 @@ class EnhancedVBSAudioDetector:
         """Clean up audio resources"""
         try:
             self.stop_detection()
+            self._close_stream()
             
             if self.audio_system:
                 self.audio_system.terminate()
@@ -8,24 +8,147 @@ Uses OpenCV + PyAutoGUI for accurate image-based clicking to avoid minimizing is
 import time
 import logging
 import os
+import re
+import ctypes
+from ctypes import wintypes
 from pathlib import Path
 from datetime import datetime
-import pyautogui
+import cv2
+import numpy as np
+from PIL import ImageGrab
 import win32gui
 import win32con
 import win32api
 
-# Configure PyAutoGUI
-pyautogui.FAILSAFE = False
-pyautogui.PAUSE = 0.2
+# pyautogui's eager import used to mark the process DPI aware - do it explicitly so
+# ImageGrab and the SendInput/SetCursorPos coordinates stay in physical pixels
+try:
+    ctypes.windll.user32.SetProcessDPIAware()
+except (AttributeError, OSError):
+    pass
+
+# PyAutoGUI is only needed for the fallback mouse click - import it lazily
+# (its eager pyscreeze/PIL/backend imports cost ~300ms per cold BAT start)
+_pyautogui = None
+
+def _get_pyautogui():
+    """Import and configure PyAutoGUI on first use"""
+    global _pyautogui
+    if _pyautogui is None:
+        import pyautogui
+        pyautogui.FAILSAFE = False
+        pyautogui.PAUSE = 0.2
+        _pyautogui = pyautogui
+    return _pyautogui
+
+# Template matching - coarse pass runs on a 1/4 scale grayscale screen
+COARSE_SCALE = 0.25
+MIN_COARSE_TEMPLATE_SIZE = 8   # Below this (px) the coarse template is useless
+COARSE_TOP_K = 3               # Coarse peaks refined at full res even when only the best match is wanted
+
+# OpenCV T-API: run matchTemplate through OpenCL (e.g. Intel iGPU) when available
+cv2.ocl.setUseOpenCL(cv2.ocl.haveOpenCL())
+USE_OPENCL = cv2.ocl.useOpenCL()
+
+def _match_template(image, template):
+    """cv2.matchTemplate (TM_CCOEFF_NORMED) - OpenCL path when available, CPU otherwise"""
+    if USE_OPENCL:
+        return cv2.matchTemplate(cv2.UMat(image), cv2.UMat(template), cv2.TM_CCOEFF_NORMED).get()
+    return cv2.matchTemplate(image, template, cv2.TM_CCOEFF_NORMED)
+
+# Decoded templates shared by every Phase 2 run in this process (image name -> array)
+_TEMPLATE_CACHE = {}         # full-res grayscale
+_TEMPLATE_SMALL_CACHE = {}   # COARSE_SCALE grayscale (only if large enough)
+
+def _load_template(image_path):
+    """Decode a template once per process - returns the grayscale array or None"""
+    name = image_path.name
+    if name in _TEMPLATE_CACHE:
+        return _TEMPLATE_CACHE[name]
+    
+    # np.fromfile + imdecode handles non-ASCII paths (cv2.imread does not on Windows)
+    template = cv2.imdecode(np.fromfile(str(image_path), dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+    if template is None:
+        return None
+    
+    _TEMPLATE_CACHE[name] = template
+    small = cv2.resize(template, None, fx=COARSE_SCALE, fy=COARSE_SCALE,
+                       interpolation=cv2.INTER_AREA)
+    if min(small.shape[:2]) >= MIN_COARSE_TEMPLATE_SIZE:
+        _TEMPLATE_SMALL_CACHE[name] = small
+    return template
+
+def _find_peaks(result, threshold, min_dx, min_dy, limit):
+    """Match locations >= threshold, best first, one per template-sized neighbourhood
+    
+    Returns [(x, y, score)] top-left positions in result coordinates.
+    """
+    ys, xs = np.where(result >= threshold)
+    if len(xs) == 0:
+        return []
+    
+    scores = result[ys, xs]
+    min_dx, min_dy = max(min_dx // 2, 1), max(min_dy // 2, 1)
+    peaks = []
+    for i in np.argsort(scores)[::-1]:
+        x, y = int(xs[i]), int(ys[i])
+        # Suppress neighbours of an already accepted (stronger) peak
+        if all(abs(x - px) >= min_dx or abs(y - py) >= min_dy for px, py, _ in peaks):
+            peaks.append((x, y, float(scores[i])))
+            if len(peaks) >= limit:
+                break
+    return peaks
+
+def _preload_templates(images_dir, image_names):
+    """Decode all templates up front - returns the names that could not be loaded"""
+    failed = []
+    for name in image_names:
+        image_path = images_dir / name
+        if not image_path.exists() or _load_template(image_path) is None:
+            failed.append(name)
+    return failed
+
+# Win32 SendInput structures (keybd_event is the legacy API)
+INPUT_KEYBOARD = 1
+GA_ROOT = 2   # GetAncestor: top-level window of a child control
+ULONG_PTR = ctypes.c_size_t
+
+class KEYBDINPUT(ctypes.Structure):
+    _fields_ = [("wVk", wintypes.WORD),
+                ("wScan", wintypes.WORD),
+                ("dwFlags", wintypes.DWORD),
+                ("time", wintypes.DWORD),
+                ("dwExtraInfo", ULONG_PTR)]
+
+class MOUSEINPUT(ctypes.Structure):
+    _fields_ = [("dx", wintypes.LONG),
+                ("dy", wintypes.LONG),
+                ("mouseData", wintypes.DWORD),
+                ("dwFlags", wintypes.DWORD),
+                ("time", wintypes.DWORD),
+                ("dwExtraInfo", ULONG_PTR)]
+
+class _INPUTUNION(ctypes.Union):
+    # MOUSEINPUT is the largest member - keeps sizeof(INPUT) correct for SendInput
+    _fields_ = [("ki", KEYBDINPUT), ("mi", MOUSEINPUT)]
+
+class INPUT(ctypes.Structure):
+    _fields_ = [("type", wintypes.DWORD), ("union", _INPUTUNION)]
 
 class VBSPhase2Clean:
     """Clean VBS Phase 2 Navigation - Image-based clicking for all steps"""
     
+    # VBS window title filters - compiled once, single regex scan per title
+    _VBS_INCLUDE = re.compile(r'absons|arabian|moonflower', re.I)
+    _VBS_EXCLUDE = re.compile(r'sql|outlook|browser|chrome|firefox', re.I)
+    
     def __init__(self):
         self.logger = self._setup_logging()
         self.vbs_window = None
         self.images_dir = None
+        self._templates = _TEMPLATE_CACHE               # image name -> full-res grayscale
+        self._templates_small = _TEMPLATE_SMALL_CACHE   # image name -> COARSE_SCALE grayscale
+        self._last_clicks = {}                          # image name -> last clicked screen point
         
         # Initialize
         self._find_vbs_window()
@@ -67,20 +190,24 @@ class VBSPhase2Clean:
                 if not win32gui.IsWindowVisible(hwnd):
                     return True
                     
-                title = win32gui.GetWindowText(hwnd).lower()
+                title = win32gui.GetWindowText(hwnd)
                 
-                # ONLY look for VBS indicators
-                if any(word in title for word in ['absons', 'arabian', 'moonflower']):
-                    # EXCLUDE non-VBS windows
-                    if not any(word in title for word in ['sql', 'outlook', 'browser', 'chrome', 'firefox']):
-                        windows.append((hwnd, title))
+                # ONLY look for VBS indicators, EXCLUDE non-VBS windows
+                if self._VBS_INCLUDE.search(title) and not self._VBS_EXCLUDE.search(title):
+                    windows.append((hwnd, title.lower()))
                         
             except:
                 pass
-            return True
+            # Returning False stops EnumWindows - only one VBS handle is needed
+            return len(windows) == 0
         
         windows = []
-        win32gui.EnumWindows(check_window, windows)
+        try:
+            win32gui.EnumWindows(check_window, windows)
+        except win32gui.error:
+            # Some pywin32 builds raise when the callback stops enumeration early
+            if not windows:
+                raise
         
         if windows:
             self.vbs_window = windows[0][0]
@@ -117,10 +244,8 @@ class VBSPhase2Clean:
                 "06_credit_radio_button.png"
             ]
             
-            missing_images = []
-            for img in required_images:
-                if not (self.images_dir / img).exists():
-                    missing_images.append(img)
+            # Decode templates (cached for the whole process - repeat runs are free)
+            missing_images = _preload_templates(self.images_dir, required_images)
             
             if missing_images:
                 self.logger.warning(f"⚠️ Missing images: {missing_images}")
@@ -133,6 +258,14 @@ class VBSPhase2Clean:
         """SUPERIOR VBS window focusing - brings VBS to TOP above ALL applications"""
         if not self.vbs_window:
             return False
+        
+        # FAST PATH: VBS already foreground and maximized (not iconic) - nothing to do
+        try:
+            if (win32gui.GetForegroundWindow() == self.vbs_window
+                    and win32gui.GetWindowPlacement(self.vbs_window)[1] == win32con.SW_SHOWMAXIMIZED):
+                return True
+        except Exception:
+            pass  # Fall through to the full focus sequence
             
         try:
             # Make sure it's still valid
@@ -195,8 +328,139 @@ class VBSPhase2Clean:
             except:
                 return False
     
-    def _click_image(self, image_name, timeout=30, required=True):
-        """Click on image - VBS window only with anti-minimize protection"""
+    def _grab_screen_gray(self):
+        """Take one screenshot and convert it to grayscale"""
+        return cv2.cvtColor(np.asarray(ImageGrab.grab()), cv2.COLOR_RGB2GRAY)
+    
+    def _locate_cv2(self, image_name, confidence=0.8, expected_region=None):
+        """Locate image on screen - returns (center_x, center_y, confidence) or None
+        
+        With expected_region (left, top, right, bottom) all matches are considered
+        and the one in/closest to that region wins (e.g. identical radio buttons).
+        """
+        if image_name not in self._templates:
+            return None
+        screen = self._grab_screen_gray()
+        if expected_region is None:
+            return self._match_on_screen(screen, image_name, confidence)
+        
+        hits = self._match_all_on_screen(screen, image_name, confidence)
+        return self._pick_in_region(hits, expected_region) if hits else None
+    
+    def _locate_any(self, image_names, confidence=0.8):
+        """Match several templates against ONE screenshot - returns {name: (x, y, confidence)}"""
+        names = [name for name in image_names if name in self._templates]
+        if not names:
+            return {}
+        
+        screen = self._grab_screen_gray()
+        hits = {}
+        for name in names:
+            hit = self._match_on_screen(screen, name, confidence)
+            if hit:
+                hits[name] = hit
+        return hits
+    
+    def _wait_for_any(self, image_names, timeout):
+        """Poll (50ms) until any of the images is visible - replaces fixed UI delays
+        
+        Returns the hits dict, or {} after timeout (never waits longer than the old fixed delay).
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            hits = self._locate_any(image_names)
+            if hits or time.monotonic() >= deadline:
+                return hits
+            time.sleep(0.05)
+    
+    def _match_on_screen(self, screen, image_name, confidence):
+        """Best match of one cached template - (center_x, center_y, confidence) or None"""
+        hits = self._match_all_on_screen(screen, image_name, confidence, max_hits=1)
+        return hits[0] if hits else None
+    
+    def _match_all_on_screen(self, screen, image_name, confidence, max_hits=5):
+        """All matches of one cached template, best first - [(center_x, center_y, confidence)]
+        
+        Coarse match on a 1/4 scale copy, then verify each coarse candidate at
+        full resolution in a small window around it.
+        """
+        template = self._templates[image_name]
+        h, w = template.shape[:2]
+        
+        template_small = self._templates_small.get(image_name)
+        if template_small is None:
+            # Template too small to downsample - match full resolution directly
+            result = _match_template(screen, template)
+            return [(x + w // 2, y + h // 2, score)
+                    for x, y, score in _find_peaks(result, confidence, w, h, max_hits)]
+        
+        # Coarse pass (looser threshold - downsampling blurs detail)
+        small = cv2.resize(screen, None, fx=COARSE_SCALE, fy=COARSE_SCALE,
+                           interpolation=cv2.INTER_AREA)
+        result = _match_template(small, template_small)
+        small_h, small_w = template_small.shape[:2]
+        
+        # The best coarse peak is not always the best full-res match (blur) - refine the top few
+        hits = []
+        pad = int(2 / COARSE_SCALE)
+        coarse_peaks = _find_peaks(result, confidence - 0.1, small_w, small_h, max(max_hits, COARSE_TOP_K))
+        for coarse_x, coarse_y, _ in coarse_peaks:
+            # Fine pass: full resolution in a window around the scaled-back coarse hit
+            x0 = max(int(coarse_x / COARSE_SCALE) - pad, 0)
+            y0 = max(int(coarse_y / COARSE_SCALE) - pad, 0)
+            x1 = min(x0 + w + 2 * pad, screen.shape[1])
+            y1 = min(y0 + h + 2 * pad, screen.shape[0])
+            roi = screen[y0:y1, x0:x1]
+            if roi.shape[0] < h or roi.shape[1] < w:
+                continue
+            
+            fine = _match_template(roi, template)
+            _, max_val, _, max_loc = cv2.minMaxLoc(fine)
+            if max_val >= confidence:
+                hits.append((x0 + max_loc[0] + w // 2, y0 + max_loc[1] + h // 2, max_val))
+        
+        hits.sort(key=lambda hit: hit[2], reverse=True)
+        return hits[:max_hits]
+    
+    def _pick_in_region(self, hits, expected_region):
+        """Choose among candidate hits - best inside (left, top, right, bottom), else the closest one"""
+        left, top, right, bottom = expected_region
+        inside = [hit for hit in hits if left <= hit[0] <= right and top <= hit[1] <= bottom]
+        if inside:
+            return inside[0]
+        
+        center_x, center_y = (left + right) / 2, (top + bottom) / 2
+        return min(hits, key=lambda hit: (hit[0] - center_x) ** 2 + (hit[1] - center_y) ** 2)
+    
+    def _post_click(self, screen_x, screen_y):
+        """Click by posting WM_LBUTTONDOWN/UP to the VBS control under the point
+        
+        No cursor movement and no focus needed. Returns False (caller falls back
+        to a real mouse click) when the point is not inside a VBS window control,
+        e.g. for popup menus owned by VBS.
+        """
+        try:
+            target = win32gui.WindowFromPoint((screen_x, screen_y))
+            if not target:
+                return False
+            if target != self.vbs_window and ctypes.windll.user32.GetAncestor(target, GA_ROOT) != self.vbs_window:
+                return False
+            
+            client_x, client_y = win32gui.ScreenToClient(target, (screen_x, screen_y))
+            lParam = win32api.MAKELONG(client_x & 0xFFFF, client_y & 0xFFFF)
+            win32api.PostMessage(target, win32con.WM_LBUTTONDOWN, win32con.MK_LBUTTON, lParam)
+            win32api.PostMessage(target, win32con.WM_LBUTTONUP, 0, lParam)
+            return True
+            
+        except Exception as e:
+            self.logger.debug(f"PostMessage click failed: {e}")
+            return False
+    
+    def _click_image(self, image_name, timeout=30, required=True, expected_region=None):
+        """Click on image - VBS window only with anti-minimize protection
+        
+        expected_region (left, top, right, bottom) picks between several matches.
+        """
         if not self.images_dir:
             self.logger.error("No images directory")
             return False
@@ -213,31 +477,34 @@ class VBSPhase2Clean:
         
         self.logger.info(f"Looking for: {image_name}")
         
-        # Try to find image with increased attempts for reliability
-        max_attempts = timeout // 0.5  # Convert timeout to attempts (0.5s per attempt)
-        for attempt in range(int(max_attempts)):
+        # Poll with exponential backoff: 50ms, 75ms, 112ms ... capped at 0.5s
+        delay = 0.05
+        deadline = time.monotonic() + timeout
+        attempt = 0
+        while time.monotonic() < deadline:
             try:
                 # Take screenshot and look for image
-                location = pyautogui.locateOnScreen(str(image_path), confidence=0.8)
-                if location:
-                    center = pyautogui.center(location)
-                    
-                    # Ensure VBS is still focused before clicking
-                    self._focus_vbs_only()
-                    time.sleep(0.3)
+                hit = self._locate_cv2(image_name, confidence=0.8, expected_region=expected_region)
+                if hit:
+                    center = (hit[0], hit[1])
+                    self._last_clicks[image_name] = center
                     
-                    # Gentle click to avoid window state changes
-                    pyautogui.click(center)
+                    # Direct window-message click - no cursor move, no focus dance
+                    if not self._post_click(*center):
+                        # Not a VBS child control (e.g. popup menu) - real mouse click
+                        self._focus_vbs_only()
+                        time.sleep(0.3)
+                        _get_pyautogui().click(center)
                     self.logger.info(f"✅ Clicked {image_name} at {center}")
                     return True
                     
-            except pyautogui.ImageNotFoundException:
-                pass
             except Exception as e:
                 if required:
                     self.logger.warning(f"Click attempt {attempt+1} failed: {e}")
             
-            time.sleep(0.5)
+            time.sleep(delay)
+            delay = min(delay * 1.5, 0.5)
+            attempt += 1
             
         if required:
             self.logger.error(f"❌ Could not find {image_name} after {timeout} seconds")
@@ -262,9 +529,19 @@ class VBSPhase2Clean:
         
         try:
             vk_code = key_codes[key]
-            win32api.keybd_event(vk_code, 0, 0, 0)
-            time.sleep(0.05)
-            win32api.keybd_event(vk_code, 0, win32con.KEYEVENTF_KEYUP, 0)
+            
+            # Key down + key up in one SendInput batch (atomic, no sleep needed)
+            inputs = (INPUT * 2)()
+            inputs[0].type = INPUT_KEYBOARD
+            inputs[0].union.ki = KEYBDINPUT(vk_code, 0, 0, 0, 0)
+            inputs[1].type = INPUT_KEYBOARD
+            inputs[1].union.ki = KEYBDINPUT(vk_code, 0, win32con.KEYEVENTF_KEYUP, 0, 0)
+            
+            sent = ctypes.windll.user32.SendInput(2, ctypes.byref(inputs), ctypes.sizeof(INPUT))
+            if sent != 2:
+                self.logger.error(f"SendInput failed for {key} (sent {sent}/2)")
+                return False
+            
             self.logger.info(f"Pressed {key}")
             return True
             
@@ -291,21 +568,21 @@ class VBSPhase2Clean:
             if not self._click_image("01_arrow_button.png"):
                 return {"success": False, "error": "Failed to click arrow button", "step": 1}
             steps.append("arrow_clicked")
-            time.sleep(self.delays["menu_open"])
+            self._wait_for_any(["02_sales_distribution_menu.png"], self.delays["menu_open"])
             
             # STEP 2: Click Sales & Distribution
             self.logger.info("Step 2: Sales & Distribution")
             if not self._click_image("02_sales_distribution_menu.png"):
                 return {"success": False, "error": "Failed to click Sales & Distribution", "step": 2}
             steps.append("sales_clicked")
-            time.sleep(self.delays["menu_open"])
+            self._wait_for_any(["03_pos_menu.png"], self.delays["menu_open"])
             
             # STEP 3: Click POS
             self.logger.info("Step 3: POS menu")
             if not self._click_image("03_pos_menu.png"):
                 return {"success": False, "error": "Failed to click POS", "step": 3}
             steps.append("pos_clicked")
-            time.sleep(self.delays["menu_open"])
+            self._wait_for_any(["04_wifi_user_registration.png"], self.delays["menu_open"])
             
             # STEP 3.1: Press 3 DOWN arrow keys after POS to ensure correct position
             self.logger.info("Step 3.1: 3 DOWN arrow keys after POS for reliable navigation")
@@ -324,7 +601,7 @@ class VBSPhase2Clean:
                 return {"success": False, "error": "Failed to press ENTER for WiFi User Registration", "step": 4}
             
             steps.append("wifi_registration_selected")
-            time.sleep(self.delays["form_load"])  # Wait for form to load
+            self._wait_for_any(["05_new_button.png"], self.delays["form_load"])  # Wait for form to load
             
             # STEP 4b: WiFi Registration form should now be open
             self.logger.info("Step 4b: WiFi Registration form opened")
@@ -335,11 +612,14 @@ class VBSPhase2Clean:
             if not self._click_image("05_new_button.png"):
                 return {"success": False, "error": "Failed to click New button", "step": 5}
             steps.append("new_button_clicked")
-            time.sleep(self.delays["button_response"])
+            self._wait_for_any(["06_credit_radio_button.png"], self.delays["button_response"])
             
             # STEP 6: Click Credit Radio Button
             self.logger.info("Step 6: Credit Radio Button")
-            if not self._click_image("06_credit_radio_button.png"):
+            # Credit radio sits below the New button - prefer matches in that area
+            new_button = self._last_clicks.get("05_new_button.png")
+            credit_region = (0, new_button[1], 1 << 16, 1 << 16) if new_button else None
+            if not self._click_image("06_credit_radio_button.png", expected_region=credit_region):
                 return {"success": False, "error": "Failed to click Credit radio button", "step": 6}
             steps.append("credit_radio_selected")
             time.sleep(self.delays["after_click"])
@@ -363,33 +643,6 @@ class VBSPhase2Clean:
                 "failed_at_step": len(steps) + 1
             }
 
-def main():
-    """Test the corrected Phase 2"""
-    print("Testing VBS Phase 2 - Correct Image-Based Navigation")
-    print("=" * 60)
-    print("Sequence: Arrow → Sales & Distribution → POS → WiFi User Registration → New → Credit")
-    print("=" * 60)
-    
-    phase2 = VBSPhase2Clean()
-    result = phase2.execute_phase2()
-    
-    print(f"\nResult: {result}")
-    
-    if result["success"]:
-        print("✅ Phase 2 completed successfully!")
-        print(f"✅ Steps completed: {len(result['steps_completed'])}/7")
-        print(f"✅ Sequence: {result['sequence']}")
-        print("\nCompleted steps:")
-        for i, step in enumerate(result['steps_completed'], 1):
-            print(f"  {i}. {step}")
-    else:
-        print("❌ Phase 2 failed")
-        print(f"❌ Error: {result['error']}")
-        if 'failed_at_step' in result:
-            print(f"❌ Failed at step: {result['failed_at_step']}")
-        if 'steps_completed' in result:
-            print(f"✅ Steps completed before failure: {result['steps_completed']}")
-
 def main():
     """Test the corrected Phase 2"""
     print("Testing VBS Phase 2 - Correct Image-Based Navigation")
@@ -1378,6 +1378,7 @@ class VBSPhase3Complete:
         click_strategies = ['center', 'top_left', 'bottom_right', 'left_edge', 'right_edge', 'top_right', 'bottom_left']
         
         # Multiple rounds of clicking for absolute success
+        keyboard_tried = False
         for round_num in range(3):  # 3 rounds of attempts
             self.logger.info(f"🔥 ROUND {round_num + 1}/3 - AGGRESSIVE CLICKING")
             
@@ -1441,34 +1442,37 @@ class VBSPhase3Complete:
                                     
                                     # Check if something changed
                                     time.sleep(0.3)
-                                    try:
-                                        verify = pyautogui.locateOnScreen(str(image_path), confidence=confidence)
-                                        if not verify:
-                                            self.logger.info(f"✅ SUCCESS: {image} disappeared after {strategy} click!")
-                                            return True
-                                    except:
-                                        self.logger.info(f"✅ SUCCESS: {image} click verified (exception means success)!")
+                                    if self._header_gone(image_path, confidence):
+                                        self.logger.info(f"✅ SUCCESS: {image} disappeared after {strategy} click!")
                                         return True
                                     
                                 except Exception as e:
                                     self.logger.debug(f"Strategy {strategy} error: {e}")
                                     continue
                             
-                            # If image found but clicks didn't work, try keyboard
-                            self.logger.info(f"🔥 Image found but clicks failed - trying AGGRESSIVE KEYBOARD")
-                            self._focus_vbs_only()
-                            
-                            # Aggressive keyboard sequence
-                            for key_attempt in range(5):
-                                pyautogui.press('tab')
-                                time.sleep(0.1)
-                                pyautogui.press('enter')
-                                time.sleep(0.1)
-                                pyautogui.press('space')
-                                time.sleep(0.1)
+                            # If image found but clicks didn't work, try keyboard (once - repeated tab/enter/space
+                            # would wander the form and could fire Import or Update)
+                            if not keyboard_tried:
+                                keyboard_tried = True
+                                self.logger.info(f"🔥 Image found but clicks failed - trying AGGRESSIVE KEYBOARD")
+                                self._focus_vbs_only()
+                                
+                                # Aggressive keyboard sequence
+                                for key_attempt in range(5):
+                                    pyautogui.press('tab')
+                                    time.sleep(0.1)
+                                    pyautogui.press('enter')
+                                    time.sleep(0.1)
+                                    pyautogui.press('space')
+                                    time.sleep(0.1)
+                                
+                                if self._header_gone(image_path, confidence):
+                                    self.logger.info(f"✅ SUCCESS: {image} disappeared after AGGRESSIVE KEYBOARD")
+                                    return True
+                            self.logger.info(f"ℹ️ {image} still visible - next attempt")
                             
-                            self.logger.info(f"✅ AGGRESSIVE KEYBOARD attempted - assuming success")
-                            return True
+                            # A lower confidence would only find the same spot again
+                            break
                             
                     except Exception as e:
                         continue
@@ -1500,8 +1504,10 @@ class VBSPhase3Complete:
                 except:
                     continue
             
-            self.logger.info("✅ NUCLEAR OPTION completed - assuming success")
-            return True
+            if self._all_headers_gone(available_images, confidence_levels[-1]):
+                self.logger.info("✅ NUCLEAR OPTION: EHC header no longer visible")
+                return True
+            self.logger.warning("⚠️ NUCLEAR OPTION: EHC header still visible")
             
         except Exception as e:
             self.logger.warning(f"Nuclear option failed: {e}")
@@ -1522,12 +1528,32 @@ class VBSPhase3Complete:
             pyautogui.click(400, 350)  # Another alternative
             time.sleep(0.5)
             
-            self.logger.info("✅ FINAL ATTEMPT completed")
-            return True
+            if self._all_headers_gone(available_images, confidence_levels[-1]):
+                self.logger.info("✅ FINAL ATTEMPT: EHC header no longer visible")
+                return True
+            
+            self.logger.error("❌ EHC header still visible - no click could be verified")
+            return False
             
         except Exception as e:
             self.logger.error(f"❌ FINAL ATTEMPT failed: {e}")
             return False
+    
+    def _header_gone(self, image_path, confidence):
+        """True only when a fresh locate confirms the header is no longer on screen"""
+        try:
+            return pyautogui.locateOnScreen(str(image_path), confidence=confidence) is None
+        except pyautogui.ImageNotFoundException:
+            # pyautogui >= 0.9.41 raises instead of returning None - the header really is gone
+            return True
+        except Exception as e:
+            # A failed check is not a success
+            self.logger.debug(f"Header verification failed: {e}")
+            return False
+    
+    def _all_headers_gone(self, images, confidence):
+        """True if none of the EHC header variants can be found on screen any more"""
+        return all(self._header_gone(self.images_dir / image, confidence) for image in images)
 
 
 def main():
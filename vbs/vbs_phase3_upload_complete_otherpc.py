@@ -8,6 +8,8 @@ and all documented features for reliable data upload automation.
 import time
 import logging
 import os
+import random
+import re
 import sys
 from pathlib import Path
 from datetime import datetime
@@ -15,8 +17,43 @@ import pyautogui
 import win32gui
 import win32con
 import win32api
+import win32clipboard
+import win32process
 import subprocess
+import importlib.util
 import threading
+import queue
+import ctypes
+from ctypes import wintypes
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+# Optional OpenCV fast path for template matching (falls back to pyautogui.locateOnScreen)
+try:
+    import cv2
+    import numpy as np
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
+
+try:
+    import mss
+    MSS_AVAILABLE = True
+except ImportError:
+    MSS_AVAILABLE = False
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+# Optional OCR fallback for the EHC header (needs the Tesseract binary as well)
+try:
+    import pytesseract
+    TESSERACT_AVAILABLE = True
+except ImportError:
+    TESSERACT_AVAILABLE = False
 
 # Add project root to path for imports
 project_root = Path(__file__).parent.parent
@@ -46,11 +83,172 @@ except ImportError:
 
 # Configure PyAutoGUI
 pyautogui.FAILSAFE = False
-pyautogui.PAUSE = 0.1
+pyautogui.PAUSE = 0  # No implicit sleep after every call - waits are explicit time.sleep() calls
+
+# Same shape as pyautogui's Box so callers can use .left/.top and pyautogui.center()
+Box = namedtuple("Box", "left top width height")
+
+# Coarse-to-fine matching: search at 1/4 resolution, then refine at full size near the hit
+PYRAMID_LEVELS = 2          # two cv2.pyrDown passes
+PYRAMID_REFINE_MARGIN = 16  # px of slack around the coarse hit for the full-res pass
+MIN_PYRAMID_TEMPLATE = 8    # smaller coarse templates are too blurry to trust
+PYRAMID_SOFT_THRESHOLD = 0.5  # coarse scores from here up get a local full-res refine around the hit
+PYRAMID_REJECT_FLOOR = 0.3    # coarse scores below this are rejected; in between, a full-screen match decides
+
+# Matching runs on grayscale; scores this close to the threshold are re-checked in colour
+COLOR_RECHECK_MARGIN = 0.05
+
+# Search this many px around an image's previous hit before trying its ROI hint / full screen
+LAST_HIT_RADIUS = 128
+
+# Screenshots younger than this are reused (one capture serves a whole retry cycle)
+FRAME_CACHE_TTL = 0.2
+
+# _focus_vbs_only results are reused for this long (seconds)
+FOCUS_CACHE_TTL = 0.25
+
+# VBS window title filters (one C-level scan per HWND instead of per-keyword substring checks)
+_VBS_RE = re.compile(r"absons|arabian|moonflower|wifi|ehc", re.I)
+_EXC_RE = re.compile(r"sql|outlook|browser|chrome|firefox|edge", re.I)
+
+# Email delivery retries: transient failures back off exponentially with jitter, capped
+EMAIL_MAX_ATTEMPTS = 3
+EMAIL_RETRY_BASE = 1.0     # seconds before the first retry
+EMAIL_RETRY_JITTER = 0.5   # up to +50% random spread per delay
+EMAIL_RETRY_CAP = 30.0     # longest single delay
+_TRANSIENT_EMAIL_RE = re.compile(r"time[d ]?\s*out|connection|refused|reset|temporar|unreachable|disconnected", re.I)
+
+# Click verification: mean per-pixel change of the 16x16 patch under the cursor that
+# counts as "the click landed" (smaller changes fall back to a full template re-match)
+PATCH_HALF_SIZE = 8
+PATCH_CHANGED_MEAN = 12
+
+# Both patches are sampled with the cursor parked this far (px) past the button's bottom-right corner,
+# after this settle (seconds) - a hover highlight must not count as "the click landed"
+CURSOR_PARK_GAP = 24
+CURSOR_PARK_SETTLE = 0.1
+
+# "Did the button go away?" checks tolerate fuzz - run them at half resolution
+VERIFY_SCALE = 0.5
+
+# VBS window title is re-read at most this often (seconds)
+WINDOW_TITLE_CACHE_TTL = 2.0
+
+# Root of the per-day Excel merge folders on the upload PC
+EHC_DATA_MERGE_ROOT = r"C:\Users\user\Documents\Automata2\EHC_Data_Merge"
+
+# EHC header match threshold - the best score over every header variant is compared against it once
+EHC_HEADER_MIN_CONFIDENCE = 0.55
+
+# Seconds between an EHC header click and its verification capture
+EHC_CLICK_SETTLE = 0.15
+
+# EHC header retry: wall-clock budget (seconds), first backoff and its growth factor
+EHC_HEADER_BUDGET = 30.0
+EHC_RETRY_BASE = 0.25
+EHC_RETRY_FACTOR = 1.5
+
+# STEP 10 upload success popup probe interval (seconds)
+UPLOAD_POPUP_CHECK_INTERVAL = 1800.0
+
+# Longest wait (seconds) for the popup to lose the foreground after its dismissing ENTER (old fixed sleep)
+POPUP_DISMISS_TIMEOUT = 1.0
+
+# Update button fallback confidences, strictest first (one match, then pick the rung it clears)
+UPDATE_CONFIDENCE_LADDER = (0.95, 0.85, 0.75)
+
+# Foreground title prefixes (lower-case) of the 'Upload Successful' message box
+UPLOAD_POPUP_TITLES = ("upload", "success")
+
+# Executable name prefixes killed when VBS is shut down
+VBS_PROCESS_PREFIXES = ("absons", "moonflower", "wifi", "vbs")
+
+# STEP 8 import wait: progress log and visual OK-button backstop once per slice (seconds)
+IMPORT_WAIT_SLICE = 60.0
+
+# Import wait polling: start fine, back off while nothing happens, reset on any hint of progress
+IMPORT_POLL_MIN = 1.0
+IMPORT_POLL_MAX = 10.0
+IMPORT_POLL_BACKOFF = 1.5
+
+# Win32 SendInput structures (keybd_event is the legacy API)
+INPUT_KEYBOARD = 1
+ULONG_PTR = ctypes.c_size_t
+
+class KEYBDINPUT(ctypes.Structure):
+    _fields_ = [("wVk", wintypes.WORD),
+                ("wScan", wintypes.WORD),
+                ("dwFlags", wintypes.DWORD),
+                ("time", wintypes.DWORD),
+                ("dwExtraInfo", ULONG_PTR)]
+
+class MOUSEINPUT(ctypes.Structure):
+    _fields_ = [("dx", wintypes.LONG),
+                ("dy", wintypes.LONG),
+                ("mouseData", wintypes.DWORD),
+                ("dwFlags", wintypes.DWORD),
+                ("time", wintypes.DWORD),
+                ("dwExtraInfo", ULONG_PTR)]
+
+class _INPUTUNION(ctypes.Union):
+    # MOUSEINPUT is the largest member - keeps sizeof(INPUT) correct for SendInput
+    _fields_ = [("ki", KEYBDINPUT), ("mi", MOUSEINPUT)]
+
+class INPUT(ctypes.Structure):
+    _fields_ = [("type", wintypes.DWORD), ("union", _INPUTUNION)]
+
+# Buttons that get the AGGRESSIVE click-and-verify treatment
+CRITICAL_IMAGES = frozenset({sys.intern("07_import_button.png"), sys.intern("09_update_button.png")})
 
 class VBSPhase3Complete:
     """Complete VBS Phase 3 implementation with enhanced audio detection"""
     
+    # Required images as documented (interned - compared on every click)
+    REQUIRED_IMAGES = tuple(sys.intern(name) for name in (
+        "01_import_ehc_checkbox.png",         # Import EHC checkbox
+        "02_three_dots_button.png",           # Three dots file browser
+        "04_DateExcel.png",                   # Excel file selection
+        "05_Open.png",                        # Open button
+        "06_import_button.png",               # Import button (original)
+        "06_import_button_detailed.png",      # Import button (detailed)
+        "06_import_button_detailed2.png",     # Import button (detailed2)
+        "06_ehc_user_detail_header.png",      # EHC header (alternative naming)
+        "07_ehc_user_detail_header.png",      # EHC header (corrected name)
+        "07_import_button.png",               # Import button
+        "08_import_ok_button.png",            # Import completion indicator
+        "09_update_button.png",               # Update button
+    ))
+    
+    # Multiple EHC header image variants for enhanced reliability
+    EHC_HEADER_IMAGES = tuple(sys.intern(name) for name in (
+        "07_ehc_user_detail_header.png",    # Primary image
+        "07_ehc_user_detail_header2.png",   # Secondary image
+        "06_ehc_user_detail_header.png",    # Alternative naming
+    ))
+    
+    # Update button variants tried in STEP 9
+    UPDATE_BUTTON_IMAGES = tuple(sys.intern(name) for name in (
+        "09_update_button.png",
+        "09_update_button_variant1.png",
+        "09_update_button_variant2.png",
+    ))
+    
+    # Images shown in separate dialogs that may sit outside the VBS window (searched on the full screen)
+    DIALOG_IMAGES = frozenset({"04_DateExcel.png", "05_Open.png"})
+    
+    # Search hints (anchor, fraction of searched area); misses fall back to the whole area
+    IMAGE_ROI = {
+        "05_Open.png": ("bottom-right", 0.5),           # file dialog
+        "08_import_ok_button.png": ("center", 0.5),     # centered popup
+        "09_update_button.png": ("top", 0.2),           # toolbar
+        "07_ehc_user_detail_header.png": ("top", 0.5),  # grid column header
+        "07_ehc_user_detail_header2.png": ("top", 0.5),
+        "06_ehc_user_detail_header.png": ("top", 0.5),
+    }
+    
+    # Excel folder -> (mtime_ns, first Excel file name or None); shared across instances
+    _xls_cache = {}
+    
     def __init__(self):
         self.logger = self._setup_logging()
         self.vbs_window = None
@@ -59,6 +257,9 @@ class VBSPhase3Complete:
         self.excel_filename = None
         self.enhanced_audio_detector = None
         
+        # Today's merge folder as typed into the file dialog address bar (STEP 3)
+        self._today_folder = os.path.join(EHC_DATA_MERGE_ROOT, datetime.now().strftime("%d%b").lower())
+        
         # Initialize path management
         if UTILS_AVAILABLE:
             self.path_manager = PathManager()
@@ -67,6 +268,51 @@ class VBSPhase3Complete:
             self.path_manager = None
             self.logger.warning("⚠️ PathManager not available, using fallback")
         
+        # Decoded template cache (filled in _setup_images)
+        self._tpl_cache = {}   # image name -> BGR ndarray (decoded lazily for colour re-checks)
+        self._tpl_gray = {}    # image name -> uint8 grayscale ndarray
+        self._tpl_q = {}       # image name -> quarter-resolution grayscale ndarray (pyramid)
+        self._tpl_verify = {}  # image name -> VERIFY_SCALE grayscale ndarray (_still_visible)
+        self._last_hit = {}    # image name -> (x, y) top-left of the previous match
+        
+        # Persistent screen grabber (BitBlt straight into a buffer) + short-lived frame cache
+        self._sct = mss.mss() if MSS_AVAILABLE and CV2_AVAILABLE else None
+        self._monitor = self._sct.monitors[1] if self._sct else None
+        self._frame = None
+        self._frame_time = 0.0
+        self._frame_region = None
+        self._frame_gray = None  # (frame, grayscale image) - converted once per grabbed frame
+        self._pyr_cache = None   # (buffer key, source array, coarsest pyramid level) - see _screen_pyramid
+        
+        # Last _focus_vbs_only result - skips the Win32 round trips inside tight retry loops
+        self._focus_cache = {"ts": 0.0, "ok": False}
+        
+        # Popup sounds detected by the background audio monitor (see _start_audio_monitor)
+        self._audio_events = queue.SimpleQueue()
+        self._audio_monitor = None
+        self._audio_monitor_stop = threading.Event()
+        
+        # Set by the audio callback or the popup-window watcher when the import finishes (STEP 8)
+        self._import_done = threading.Event()
+        
+        # STEP 10: set once the success popup was clicked, and the wait's wake-up call
+        self._upload_done = threading.Event()
+        self._upload_wake = threading.Event()
+        
+        # Email delivery runs here so SMTP latency never blocks a phase step (worker is non-daemon)
+        self._email_executor = ThreadPoolExecutor(max_workers=1)
+        self._email_module = None  # email_delivery module once imported (False if the import failed)
+        
+        # Resolved image paths / existing image names (filled in _setup_images)
+        self._img_paths = {}
+        self._img_exists = set()
+        self._ehc_available = ()  # EHC header variants that exist (and decode, with OpenCV)
+        
+        # Window lookup caches: HWNDs known to be gone, and the last VBS title read
+        self._dead_hwnds = set()
+        self._win_cache = {"hwnd": None, "title": "", "ts": 0.0}
+        self._vbs_class = None  # window class of the VBS main window, once found
+        
         # Initialize components
         self._find_vbs_window()
         self._setup_images()
@@ -84,25 +330,6 @@ class VBSPhase3Complete:
         else:
             self.enhanced_audio_detector = None
         
-        # Updated image sequence based on actual files provided
-        self.required_images = [
-            "01_import_ehc_checkbox.png",     # ✅ Available
-            "02_three_dots_button.png",       # ✅ Available  
-            "04_DateExcel.png",               # ✅ Available
-            "05_Open.png",                    # ✅ Available
-            "06_ehc_user_detail_header.png",  # ✅ Available
-            "07_import_button.png",           # ✅ Available
-            "08_import_ok_button.png",        # ✅ Available
-            "09_update_button.png"            # ✅ Available
-        ]
-        
-        # Multiple EHC header image variants for enhanced reliability
-        self.ehc_header_images = [
-            "07_ehc_user_detail_header.png",    # Primary image
-            "07_ehc_user_detail_header2.png",   # Secondary image
-            "06_ehc_user_detail_header.png",    # Alternative naming
-        ]
-        
         # Timing configuration (optimized for proper import/upload sequence)
         self.delays = {
             "after_click": 0.5,               # Standard click delay
@@ -167,22 +394,29 @@ class VBSPhase3Complete:
         """Find and validate VBS application window"""
         self.logger.info("🔍 Searching for VBS application window...")
         
+        # Fast path on re-searches: one FindWindow by the class we saw last time
+        if self._vbs_class:
+            try:
+                hwnd = win32gui.FindWindow(self._vbs_class, None)
+                title = win32gui.GetWindowText(hwnd) if hwnd else ""
+                if hwnd and hwnd not in self._dead_hwnds and _VBS_RE.search(title) and not _EXC_RE.search(title):
+                    self.vbs_window = hwnd
+                    self._win_cache = {"hwnd": hwnd, "title": title.lower(), "ts": time.monotonic()}
+                    self.logger.info(f"✅ Found VBS window by class: {title}")
+                    return True
+            except Exception:
+                pass
+        
         def check_window(hwnd, windows):
             try:
-                if not win32gui.IsWindowVisible(hwnd):
+                if hwnd in self._dead_hwnds or not win32gui.IsWindowVisible(hwnd):
                     return True
                     
-                title = win32gui.GetWindowText(hwnd).lower()
+                title = win32gui.GetWindowText(hwnd)
                 
-                # VBS application identifiers
-                vbs_keywords = ['absons', 'arabian', 'moonflower', 'wifi', 'ehc']
-                exclude_keywords = ['sql', 'outlook', 'browser', 'chrome', 'firefox', 'edge']
-                
-                has_vbs_keyword = any(keyword in title for keyword in vbs_keywords)
-                has_exclude = any(keyword in title for keyword in exclude_keywords)
-                
-                if has_vbs_keyword and not has_exclude:
-                    windows.append((hwnd, title))
+                # VBS application identifiers (minus SQL/Outlook/browser windows)
+                if _VBS_RE.search(title) and not _EXC_RE.search(title):
+                    windows.append((hwnd, title.lower()))
                         
             except Exception:
                 pass
@@ -193,7 +427,12 @@ class VBSPhase3Complete:
         
         if windows:
             self.vbs_window = windows[0][0]
+            self._win_cache = {"hwnd": self.vbs_window, "title": windows[0][1], "ts": time.monotonic()}
             self.logger.info(f"✅ Found VBS window: {windows[0][1]}")
+            try:
+                self._vbs_class = win32gui.GetClassName(self.vbs_window)
+            except Exception:
+                self._vbs_class = None
             
             # Validate window state
             try:
@@ -230,27 +469,22 @@ class VBSPhase3Complete:
             self.logger.error("❌ Images directory not found")
             return False
         
-        # Required images as documented (updated with correct file names)
-        required_images = [
-            "01_import_ehc_checkbox.png",         # Import EHC checkbox
-            "02_three_dots_button.png",           # Three dots file browser
-            "04_DateExcel.png",                   # Excel file selection
-            "05_Open.png",                        # Open button
-            "06_import_button.png",               # Import button (original)
-            "06_import_button_detailed.png",      # Import button (detailed)
-            "06_import_button_detailed2.png",     # Import button (detailed2)
-            "07_ehc_user_detail_header.png",      # EHC header (corrected name)
-            "08_import_ok_button.png",            # Import completion indicator
-            "09_update_button.png"                # Update button
-        ]
+        required_images = self.REQUIRED_IMAGES
+        
+        # Resolve every known image path ONCE (known = listed images + whatever is in the folder)
+        # One directory listing and one resolve() - only names missing from the listing are stat'ed
+        on_disk = {path.name for path in self.images_dir.glob("*.png")}
+        all_known = set(required_images) | set(self.EHC_HEADER_IMAGES) | on_disk
+        images_root = str(self.images_dir.resolve())
+        self._img_paths = {name: os.path.join(images_root, name) for name in all_known}
+        self._img_exists = on_disk | {name for name in all_known - on_disk if os.path.exists(self._img_paths[name])}
         
         # Validate required images
         missing_images = []
         existing_images = []
         
         for image in required_images:
-            image_path = self.images_dir / image
-            if image_path.exists():
+            if image in self._img_exists:
                 existing_images.append(image)
             else:
                 missing_images.append(image)
@@ -261,8 +495,317 @@ class VBSPhase3Complete:
             self.logger.warning(f"⚠️ Missing images: {missing_images}")
             # Continue execution - some images might be optional
         
+        # Decode every known template ONCE (pyautogui re-reads the PNG on each locate)
+        if CV2_AVAILABLE:
+            for image in dict.fromkeys(required_images + self.EHC_HEADER_IMAGES + self.UPDATE_BUTTON_IMAGES
+                                       + ("09_update_success_ok_button.png",)):
+                self._get_template(image)
+            self.logger.info(f"✅ Cached {len(self._tpl_q)} grayscale templates for OpenCV matching")
+        
+        # EHC header variants usable by _click_ehc_header_enhanced - resolved once, not per click
+        self._ehc_available = tuple(image for image in self.EHC_HEADER_IMAGES if image in self._img_exists
+                                    and (not CV2_AVAILABLE or image in self._tpl_gray))
+        for image in self.EHC_HEADER_IMAGES:
+            if image not in self._ehc_available:
+                self.logger.warning(f"❌ Missing EHC header image: {image}")
+        
         return True
     
+    def _get_template(self, image_name):
+        """Return the cached uint8 grayscale template, decoding it on first use (None if missing)"""
+        template = self._tpl_gray.get(image_name)
+        if template is None:
+            if image_name not in self._img_exists:
+                return None
+            template = cv2.imread(self._img_paths[image_name], cv2.IMREAD_GRAYSCALE)
+            if template is None:
+                return None
+            self._tpl_gray[image_name] = template
+            template_q = template
+            for _ in range(PYRAMID_LEVELS):
+                template_q = cv2.pyrDown(template_q)
+            self._tpl_q[image_name] = template_q
+        return template
+    
+    def _get_color_template(self, image_name):
+        """Return the BGR template used to confirm borderline grayscale hits (decoded on first use)"""
+        template = self._tpl_cache.get(image_name)
+        if template is None:
+            template = cv2.imread(self._img_paths[image_name], cv2.IMREAD_COLOR)
+            self._tpl_cache[image_name] = template
+        return template
+    
+    def _vbs_region(self):
+        """VBS window rectangle clipped to the primary screen, as an mss region (None if unusable)"""
+        try:
+            left, top, right, bottom = win32gui.GetWindowRect(self.vbs_window)
+        except Exception:
+            return None
+        
+        if self._monitor:
+            screen_left, screen_top = self._monitor["left"], self._monitor["top"]
+            screen_right = screen_left + self._monitor["width"]
+            screen_bottom = screen_top + self._monitor["height"]
+        else:
+            screen_left, screen_top = 0, 0
+            screen_right, screen_bottom = pyautogui.size()
+        left, top = max(left, screen_left), max(top, screen_top)
+        right, bottom = min(right, screen_right), min(bottom, screen_bottom)
+        if right - left <= 0 or bottom - top <= 0:
+            return None
+        return {"left": left, "top": top, "width": right - left, "height": bottom - top}
+    
+    def _search_region(self, image_names):
+        """Screen area to capture for these images - the VBS window unless one lives in a dialog"""
+        if not self.vbs_window or any(name in self.DIALOG_IMAGES for name in image_names):
+            return None
+        return self._vbs_region()
+    
+    def _screenshot_bgr(self, region=None):
+        """Grab region (default: primary screen) through the shared mss handle as a BGR ndarray"""
+        raw = self._sct.grab(region or self._monitor)
+        bgra = np.frombuffer(raw.bgra, dtype=np.uint8).reshape(raw.height, raw.width, 4)
+        return np.ascontiguousarray(bgra[:, :, :3])
+    
+    def close(self):
+        """Release the shared screen grabber and the email worker (queued emails still go out)"""
+        if getattr(self, "_sct", None):
+            try:
+                self._sct.close()
+            except Exception:
+                pass
+            self._sct = None
+        if getattr(self, "_email_executor", None):
+            self._email_executor.shutdown(wait=False)
+            self._email_executor = None
+    
+    def __del__(self):
+        self.close()
+    
+    def _grab_screen(self, fresh=False, region=None):
+        """Grab region (default: primary screen) as a BGR ndarray - returns (image, left, top)
+        
+        Frames of the same region younger than FRAME_CACHE_TTL are reused unless fresh=True.
+        """
+        now = time.monotonic()
+        if (not fresh and self._frame is not None and self._frame_region == region
+                and now - self._frame_time < FRAME_CACHE_TTL):
+            return self._frame
+        
+        area = region or self._monitor
+        if self._sct:
+            self._frame = (self._screenshot_bgr(area), area["left"], area["top"])
+        elif region:
+            shot = pyautogui.screenshot(region=(region["left"], region["top"], region["width"], region["height"]))
+            self._frame = (cv2.cvtColor(np.asarray(shot), cv2.COLOR_RGB2BGR), region["left"], region["top"])
+        else:
+            self._frame = (cv2.cvtColor(np.asarray(pyautogui.screenshot()), cv2.COLOR_RGB2BGR), 0, 0)
+        self._frame_region = region
+        self._frame_time = now
+        return self._frame
+    
+    def _gray_of(self, frame):
+        """Grayscale copy of a grabbed frame - converted once, shared by every template match"""
+        if self._frame_gray is None or self._frame_gray[0] is not frame:
+            self._frame_gray = (frame, cv2.cvtColor(frame[0], cv2.COLOR_BGR2GRAY))
+        return self._frame_gray[1]
+    
+    def _match_full(self, screen, template):
+        """Full-resolution match - returns (score, (x, y)) or None if screen is too small"""
+        if screen.shape[0] < template.shape[0] or screen.shape[1] < template.shape[1]:
+            return None
+        result = cv2.matchTemplate(screen, template, cv2.TM_CCOEFF_NORMED)
+        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+        return max_val, max_loc
+    
+    def _screen_pyramid(self, screen):
+        """Coarsest pyramid level of a screen region - built once and shared by every template variant"""
+        key = (screen.ctypes.data, screen.shape, screen.strides)
+        owner = screen if screen.base is None else screen.base
+        cached = self._pyr_cache
+        if cached is None or cached[0] != key or cached[1] is not owner:
+            screen_q = screen
+            for _ in range(PYRAMID_LEVELS):
+                screen_q = cv2.pyrDown(screen_q)
+            # Holding the owner keeps its buffer address from being reused by a later frame
+            cached = self._pyr_cache = (key, owner, screen_q)
+        return cached[2]
+    
+    def _match_pyramid(self, screen, image_name):
+        """Coarse-to-fine grayscale match: quarter-res search, then full-res refine around the best hit"""
+        template = self._tpl_gray[image_name]
+        template_q = self._tpl_q.get(image_name)
+        if template_q is None or min(template_q.shape[:2]) < MIN_PYRAMID_TEMPLATE:
+            return self._match_full(screen, template)
+        
+        coarse = self._match_full(self._screen_pyramid(screen), template_q)
+        if coarse is None:
+            return self._match_full(screen, template)
+        
+        # Map the coarse hit back to full resolution; only promising hits get the local refine
+        scale = 2 ** PYRAMID_LEVELS
+        h, w = template.shape[:2]
+        qx, qy = coarse[1]
+        if coarse[0] < PYRAMID_REJECT_FLOOR:
+            return coarse[0], (qx * scale, qy * scale)
+        if coarse[0] < PYRAMID_SOFT_THRESHOLD:
+            # Small or thin templates blur out at quarter scale - the coarse score can't be trusted either way
+            return self._match_full(screen, template)
+        x0 = max(0, qx * scale - PYRAMID_REFINE_MARGIN)
+        y0 = max(0, qy * scale - PYRAMID_REFINE_MARGIN)
+        x1 = min(screen.shape[1], qx * scale + w + PYRAMID_REFINE_MARGIN)
+        y1 = min(screen.shape[0], qy * scale + h + PYRAMID_REFINE_MARGIN)
+        refined = self._match_full(screen[y0:y1, x0:x1], template)
+        if refined is None:
+            return self._match_full(screen, template)
+        
+        score, (rx, ry) = refined
+        return score, (x0 + rx, y0 + ry)
+    
+    def _roi_bounds(self, roi, width, height):
+        """Translate an ROI hint like ("top", 0.2) into (x0, y0, x1, y1) screenshot bounds"""
+        anchor, fraction = roi
+        span_w, span_h = int(width * fraction), int(height * fraction)
+        if anchor == "center":
+            x0, y0 = (width - span_w) // 2, (height - span_h) // 2
+            return x0, y0, x0 + span_w, y0 + span_h
+        
+        x0, y0, x1, y1 = 0, 0, width, height
+        if "top" in anchor:
+            y1 = span_h
+        if "bottom" in anchor:
+            y0 = height - span_h
+        if "left" in anchor:
+            x1 = span_w
+        if "right" in anchor:
+            x0 = width - span_w
+        return x0, y0, x1, y1
+    
+    def _match_region(self, screen, screen_gray, image_name, confidence, pyramid, bounds):
+        """Match inside (x0, y0, x1, y1) of the screenshot - returns (score, (x, y)) or None"""
+        h, w = self._tpl_gray[image_name].shape[:2]
+        x0, y0 = max(0, bounds[0]), max(0, bounds[1])
+        x1, y1 = min(screen.shape[1], bounds[2]), min(screen.shape[0], bounds[3])
+        region_gray = screen_gray[y0:y1, x0:x1]
+        
+        if pyramid:
+            match = self._match_pyramid(region_gray, image_name)
+        else:
+            match = self._match_full(region_gray, self._tpl_gray[image_name])
+        if match is None:
+            return None
+        
+        score, (x, y) = match
+        x, y = x0 + x, y0 + y
+        
+        # Borderline luminance-only hit - confirm it in colour at the same spot
+        if abs(score - confidence) < COLOR_RECHECK_MARGIN:
+            cx0 = max(0, x - PYRAMID_REFINE_MARGIN)
+            cy0 = max(0, y - PYRAMID_REFINE_MARGIN)
+            template = self._get_color_template(image_name)
+            color = None
+            if template is not None:
+                color = self._match_full(screen[cy0:y + h + PYRAMID_REFINE_MARGIN, cx0:x + w + PYRAMID_REFINE_MARGIN], template)
+            if color is not None:
+                score, (cx, cy) = color
+                x, y = cx0 + cx, cy0 + cy
+        
+        if score < confidence:
+            return None
+        return score, (x, y)
+    
+    def _search_frame(self, frame, screen_gray, image_name, confidence, pyramid=False, roi=None):
+        """Search one grabbed frame for image_name - returns (score, Box) or None
+        
+        Searches around the previous hit first, then the ROI hint, then the full screen.
+        """
+        template = self._get_template(image_name)
+        if template is None:
+            return None
+        
+        screen, left, top = frame
+        height, width = screen_gray.shape
+        h, w = template.shape[:2]
+        
+        search_order = []
+        last_hit = self._last_hit.get(image_name)
+        if last_hit:
+            lx, ly = last_hit
+            search_order.append((lx - LAST_HIT_RADIUS, ly - LAST_HIT_RADIUS,
+                                 lx + w + LAST_HIT_RADIUS, ly + h + LAST_HIT_RADIUS))
+        if roi:
+            search_order.append(self._roi_bounds(roi, width, height))
+        search_order.append((0, 0, width, height))
+        
+        for bounds in search_order:
+            hit = self._match_region(screen, screen_gray, image_name, confidence, pyramid, bounds)
+            if hit:
+                score, (x, y) = hit
+                self._last_hit[image_name] = (x, y)
+                return score, Box(left + x, top + y, w, h)
+        
+        return None
+    
+    def _locate(self, image_name, confidence=0.8, pyramid=False, roi=None, fresh=False):
+        """Locate image on screen - returns Box(left, top, width, height) or None
+        
+        Pass fresh=True when checking the result of a click (bypasses the frame cache).
+        """
+        if not CV2_AVAILABLE:
+            try:
+                return pyautogui.locateOnScreen(self._img_paths[image_name], confidence=confidence)
+            except Exception:
+                return None
+        
+        frame = self._grab_screen(fresh=fresh, region=self._search_region((image_name,)))
+        screen_gray = self._gray_of(frame)
+        hit = self._search_frame(frame, screen_gray, image_name, confidence, pyramid, roi)
+        return hit[1] if hit else None
+    
+    def _match_best(self, image_names, confidence=0.8, pyramid=False, roi=None, fresh=False):
+        """Match several template variants against ONE screenshot - returns (name, score, Box) or (None, None, None)
+        
+        Without OpenCV there is no score; the first variant found reports confidence as its score.
+        """
+        if not CV2_AVAILABLE:
+            for image_name in image_names:
+                location = self._locate(image_name, confidence)
+                if location:
+                    return image_name, confidence, location
+            return None, None, None
+        
+        frame = self._grab_screen(fresh=fresh, region=self._search_region(image_names))
+        screen_gray = self._gray_of(frame)
+        best_name, best_score, best_box = None, None, None
+        for image_name in image_names:
+            hit = self._search_frame(frame, screen_gray, image_name, confidence, pyramid, roi)
+            if hit and (best_score is None or hit[0] > best_score):
+                best_name, (best_score, best_box) = image_name, hit
+        return best_name, best_score, best_box
+    
+    def _locate_best(self, image_names, confidence=0.8, pyramid=False, roi=None, fresh=False):
+        """Match several template variants against ONE screenshot - returns (name, Box) or (None, None)"""
+        name, _, location = self._match_best(image_names, confidence, pyramid, roi, fresh)
+        return name, location
+    
+    def _still_visible(self, image_name, confidence=0.7):
+        """Fresh, half-resolution grayscale check that image_name is still on screen"""
+        if not CV2_AVAILABLE or self._get_template(image_name) is None:
+            return self._locate(image_name, confidence=confidence, fresh=True) is not None
+        
+        # Downsampled template gets its own cache - _tpl_gray stays keyed by image name only
+        template_small = self._tpl_verify.get(image_name)
+        if template_small is None:
+            template_small = cv2.resize(self._tpl_gray[image_name], None, fx=VERIFY_SCALE, fy=VERIFY_SCALE,
+                                        interpolation=cv2.INTER_AREA)
+            self._tpl_verify[image_name] = template_small
+        
+        frame = self._grab_screen(fresh=True, region=self._search_region((image_name,)))
+        small = cv2.resize(self._gray_of(frame), None, fx=VERIFY_SCALE, fy=VERIFY_SCALE,
+                           interpolation=cv2.INTER_AREA)
+        match = self._match_full(small, template_small)
+        return match is not None and match[0] >= confidence
+    
     def _find_excel_merge_info(self):
         """Find Excel merge folder and file for today's date"""
         self.logger.info("📊 Finding Excel merge information...")
@@ -280,11 +823,20 @@ class VBSPhase3Complete:
             self.excel_merge_folder = str(excel_dir.absolute())
             self.logger.info(f"📁 Excel merge folder: {self.excel_merge_folder}")
             
-            # Find Excel file
+            # Find Excel file (folder scan skipped while the folder's mtime is unchanged)
             if excel_dir.exists():
-                excel_files = list(excel_dir.glob("*.xls*"))
-                if excel_files:
-                    self.excel_filename = excel_files[0].name
+                mtime_ns = excel_dir.stat().st_mtime_ns
+                cached = self._xls_cache.get(str(excel_dir))
+                if cached and cached[0] == mtime_ns:
+                    excel_name = cached[1]
+                else:
+                    excel_file = next((path for path in excel_dir.iterdir()
+                                       if path.suffix.lower().startswith(".xls")), None)
+                    excel_name = excel_file.name if excel_file else None
+                    self._xls_cache[str(excel_dir)] = (mtime_ns, excel_name)
+                
+                if excel_name:
+                    self.excel_filename = excel_name
                     self.logger.info(f"📄 Found Excel file: {self.excel_filename}")
                 else:
                     # Generate expected filename
@@ -301,7 +853,27 @@ class VBSPhase3Complete:
             self.logger.error(f"❌ Excel merge info setup failed: {e}")
             return False
     
+    def _invalidate_focus_cache(self):
+        """Force the next _focus_vbs_only call to talk to Win32 again"""
+        self._focus_cache["ts"] = 0.0
+    
     def _focus_vbs_only(self):
+        """Focus VBS window (result cached for FOCUS_CACHE_TTL seconds)"""
+        now = time.monotonic()
+        if now - self._focus_cache["ts"] < FOCUS_CACHE_TTL:
+            return self._focus_cache["ok"]
+        
+        ok = self._focus_vbs_window()
+        self._focus_cache = {"ts": time.monotonic(), "ok": ok}
+        return ok
+    
+    def _ensure_vbs_foreground(self):
+        """Re-focus VBS only when another window has taken the foreground (one cheap Win32 call otherwise)"""
+        if win32gui.GetForegroundWindow() != self.vbs_window:
+            self._invalidate_focus_cache()
+            self._focus_vbs_only()
+    
+    def _focus_vbs_window(self):
         """Focus VBS window with comprehensive error handling"""
         if not self.vbs_window:
             self.logger.warning("WARN: No VBS window to focus")
@@ -311,6 +883,7 @@ class VBSPhase3Complete:
             # Validate window still exists
             if not win32gui.IsWindow(self.vbs_window):
                 self.logger.warning("WARN: VBS window no longer exists, searching again...")
+                self._dead_hwnds.add(self.vbs_window)
                 if not self._find_vbs_window():
                     return False
             
@@ -366,13 +939,23 @@ class VBSPhase3Complete:
             return "not_found"
             
         try:
+            # Reuse the title read in the last WINDOW_TITLE_CACHE_TTL seconds
+            cache = self._win_cache
+            if cache["hwnd"] == self.vbs_window and time.monotonic() - cache["ts"] < WINDOW_TITLE_CACHE_TTL:
+                title = cache["title"]
+                if "not responding" in title.lower():
+                    return "not_responding"
+                return "responsive"
+            
             # Check if window exists
             if not win32gui.IsWindow(self.vbs_window):
+                self._dead_hwnds.add(self.vbs_window)
                 return "not_found"
             
             # Get window text to check responsiveness
             try:
                 title = win32gui.GetWindowText(self.vbs_window)
+                self._win_cache = {"hwnd": self.vbs_window, "title": title, "ts": time.monotonic()}
                 if "(Not Responding)" in title or "not responding" in title.lower():
                     return "not_responding"
                 else:
@@ -385,30 +968,84 @@ class VBSPhase3Complete:
             self.logger.debug(f"Window state check failed: {e}")
             return "unknown"
     
-    def _click_image(self, image_name, click_offset=None, timeout=10, required=True):
-        """Click on image with AGGRESSIVE verification for critical buttons"""
+    def _patch_at(self, x, y, fresh=False, region=None):
+        """Grayscale patch (16x16) around screen point (x, y), or None without OpenCV"""
+        if not CV2_AVAILABLE:
+            return None
+        frame = self._grab_screen(fresh=fresh, region=region)
+        screen_gray = self._gray_of(frame)
+        px, py = int(x - frame[1]), int(y - frame[2])
+        patch = screen_gray[max(0, py - PATCH_HALF_SIZE):py + PATCH_HALF_SIZE,
+                            max(0, px - PATCH_HALF_SIZE):px + PATCH_HALF_SIZE]
+        if not patch.size:
+            return None
+        return patch
+    
+    def _post_click(self, x, y):
+        """Post WM_LBUTTONDOWN/UP to the VBS window under screen point (x, y) - no cursor move or focus needed
+        
+        Returns False (nothing sent) when the point is not over the VBS window or one of its children.
+        """
+        try:
+            point = (int(x), int(y))
+            hwnd = win32gui.WindowFromPoint(point)
+            if not hwnd or (hwnd != self.vbs_window and not win32gui.IsChild(self.vbs_window, hwnd)):
+                return False
+            client_x, client_y = win32gui.ScreenToClient(hwnd, point)
+            lparam = win32api.MAKELONG(client_x & 0xFFFF, client_y & 0xFFFF)
+            win32gui.PostMessage(hwnd, win32con.WM_LBUTTONDOWN, win32con.MK_LBUTTON, lparam)
+            win32gui.PostMessage(hwnd, win32con.WM_LBUTTONUP, 0, lparam)
+            return True
+        except Exception:
+            return False
+    
+    def _park_cursor_off(self, location):
+        """Move the cursor just outside the matched box so hover effects are gone from the next capture"""
+        win32api.SetCursorPos((int(location.left + location.width + CURSOR_PARK_GAP),
+                               int(location.top + location.height + CURSOR_PARK_GAP)))
+        time.sleep(CURSOR_PARK_SETTLE)
+    
+    def _click_xy(self, x, y):
+        """Left-click at screen coordinates via Win32 (no pyautogui pause/failsafe overhead)"""
+        win32api.SetCursorPos((int(x), int(y)))
+        win32api.mouse_event(win32con.MOUSEEVENTF_LEFTDOWN, 0, 0, 0, 0)
+        win32api.mouse_event(win32con.MOUSEEVENTF_LEFTUP, 0, 0, 0, 0)
+    
+    def _click_image(self, image_name, click_offset=None, timeout=10, required=True, roi=None):
+        """Click on image with AGGRESSIVE verification for critical buttons
+        
+        image_name may also be a list of template variants; the best match is clicked.
+        """
+        variants = [image_name] if isinstance(image_name, str) else list(image_name)
+        if not isinstance(image_name, str):
+            image_name = " / ".join(variants)
+        
         if not self.images_dir:
             if required:
                 self.logger.error(f"❌ No images directory for {image_name}")
             return False
             
-        image_path = self.images_dir / image_name
-        if not image_path.exists():
+        variants = [variant for variant in variants if variant in self._img_exists]
+        if not variants:
             if required:
                 self.logger.error(f"❌ Image not found: {image_name}")
             return False
         
+        # Default to the image's ROI hint (if any)
+        if roi is None:
+            roi = self.IMAGE_ROI.get(variants[0])
+        
         # Focus VBS window before clicking
         self._focus_vbs_only()
         
         # For critical buttons (import, update), use aggressive clicking
-        if image_name in ["07_import_button.png", "09_update_button.png"]:
+        if any(variant in CRITICAL_IMAGES for variant in variants):
             self.logger.info(f"🎯 AGGRESSIVE MODE: {image_name}")
             
-            # Multiple attempts for critical buttons
+            # Multiple attempts for critical buttons (one screenshot per attempt covers every variant)
             for attempt in range(5):
                 try:
-                    location = pyautogui.locateOnScreen(str(image_path), confidence=0.8)
+                    matched, location = self._locate_best(variants, confidence=0.8, pyramid=True, roi=roi)
                     if location:
                         # Calculate click position
                         if click_offset == "right":
@@ -417,16 +1054,30 @@ class VBSPhase3Complete:
                         else:
                             click_x, click_y = pyautogui.center(location)
                         
+                        # Patch under the click point before clicking - sampled with the cursor off the button
+                        region = self._search_region((matched,))
+                        self._park_cursor_off(location)
+                        patch_before = self._patch_at(click_x, click_y, fresh=True, region=region)
+                        
                         # Aggressive clicking - multiple clicks
                         self._focus_vbs_only()
-                        pyautogui.click(click_x, click_y)
+                        self._click_xy(click_x, click_y)
                         time.sleep(0.3)
-                        pyautogui.click(click_x, click_y)  # Double click
+                        self._click_xy(click_x, click_y)  # Double click
                         time.sleep(0.5)
                         
-                        # Check if button disappeared
+                        # Cheap check first: did the pixels under the click change? (cursor parked off again)
+                        self._park_cursor_off(location)
+                        patch_after = self._patch_at(click_x, click_y, fresh=True, region=region)
+                        if patch_before is not None and patch_after is not None and patch_before.shape == patch_after.shape:
+                            change = np.abs(patch_after.astype(np.int16) - patch_before.astype(np.int16)).mean()
+                            if change >= PATCH_CHANGED_MEAN:
+                                self.logger.info(f"✅ VERIFIED: {image_name} clicked successfully (attempt {attempt+1}, screen changed)")
+                                return True
+                        
+                        # Check if button disappeared (reuses the frame grabbed for the patch)
                         try:
-                            still_there = pyautogui.locateOnScreen(str(image_path), confidence=0.8)
+                            still_there = self._locate(matched, confidence=0.8, pyramid=True, roi=roi, fresh=patch_after is None)
                             if not still_there:
                                 self.logger.info(f"✅ VERIFIED: {image_name} clicked successfully (attempt {attempt+1})")
                                 return True
@@ -440,16 +1091,18 @@ class VBSPhase3Complete:
                         
                 except Exception as e:
                     self.logger.warning(f"❌ Attempt {attempt+1} failed: {e}")
+                    self._invalidate_focus_cache()
                 
                 time.sleep(0.5)
             
             # If all attempts failed
             self.logger.error(f"❌ CRITICAL FAILURE: {image_name} not clicked after 5 attempts")
+            self._invalidate_focus_cache()
             return False
         
         # For non-critical buttons, use standard method
         try:
-            location = pyautogui.locateOnScreen(str(image_path), confidence=0.9)
+            matched, location = self._locate_best(variants, confidence=0.9, roi=roi)
             if location:
                 # Calculate click position
                 if click_offset == "right":
@@ -459,27 +1112,37 @@ class VBSPhase3Complete:
                     click_x, click_y = pyautogui.center(location)
                 
                 # Perform the actual click
-                pyautogui.click(click_x, click_y)
+                self._click_xy(click_x, click_y)
                 time.sleep(0.5)  # Reduced delay
-                self.logger.info(f"✅ Clicked: {image_name}")
+                self.logger.info(f"✅ Clicked: {matched}")
                 return True
             else:
                 if required:
                     self.logger.error(f"❌ Could not locate: {image_name}")
+                self._invalidate_focus_cache()
                 return False
                 
         except Exception as e:
             if required:
                 self.logger.error(f"❌ Click failed for {image_name}: {e}")
+            self._invalidate_focus_cache()
             return False
     
     def _press_enter_instant(self):
-        """Press ENTER instantly using Win32API for popup handling"""
+        """Press ENTER instantly using Win32 SendInput for popup handling"""
         try:
-            # Use Win32API for maximum speed
-            win32api.keybd_event(win32con.VK_RETURN, 0, 0, 0)
-            time.sleep(0.01)  # Minimal key press duration
-            win32api.keybd_event(win32con.VK_RETURN, 0, win32con.KEYEVENTF_KEYUP, 0)
+            # Key down + key up in one SendInput batch (atomic, no sleep needed)
+            inputs = (INPUT * 2)()
+            inputs[0].type = INPUT_KEYBOARD
+            inputs[0].union.ki = KEYBDINPUT(win32con.VK_RETURN, 0, 0, 0, 0)
+            inputs[1].type = INPUT_KEYBOARD
+            inputs[1].union.ki = KEYBDINPUT(win32con.VK_RETURN, 0, win32con.KEYEVENTF_KEYUP, 0, 0)
+            
+            sent = ctypes.windll.user32.SendInput(2, ctypes.byref(inputs), ctypes.sizeof(INPUT))
+            if sent != 2:
+                self.logger.error(f"❌ INSTANT ENTER failed: SendInput sent {sent}/2")
+                return False
+            
             self.logger.info("⚡ INSTANT ENTER pressed")
             return True
             
@@ -492,37 +1155,44 @@ class VBSPhase3Complete:
         try:
             self.logger.info("🔊 AUDIO TEST: Clicking three dots with audio detection verification")
             
-            # Initialize audio detector for click sound detection
-            audio_detector = None
-            if AUDIO_DETECTION_AVAILABLE:
+            # Reuse the shared detector (opening a new audio device per click costs 50-200ms)
+            audio_detector = self.enhanced_audio_detector
+            monitored = self._audio_monitor is not None and self._audio_monitor.is_alive()
+            dots_heard = threading.Event()  # set by the detector callback on the click sound
+            if audio_detector is not None and not monitored:
                 try:
-                    audio_detector = EnhancedVBSAudioDetector(self.vbs_window)
-                    audio_detector.initialize_audio_system()
+                    audio_detector.start_detection(success_callback=dots_heard.set, timeout=5.0)
                     self.logger.info("AUDIO: Audio detector ready for 3 dots click sound")
-                    
-                    # Start audio detection
-                    audio_detector.start_detection(timeout=5.0)
                 except Exception as e:
-                    self.logger.warning(f"WARN: Audio detector setup failed: {e}")
+                    self.logger.warning(f"WARN: Audio detector start failed: {e}")
             
             # Click the three dots button
             if not self._click_image("02_three_dots_button.png"):
+                if audio_detector is not None and not monitored:
+                    audio_detector.stop_detection()
                 return False
             
             # Check if we detected the click sound
-            if audio_detector:
+            if audio_detector is not None:
                 try:
-                    time.sleep(1.0)  # Brief wait for sound detection
-                    if audio_detector.success_detected:
+                    if monitored:
+                        # Background monitor owns the detector - consume its event so later waits don't see it
+                        try:
+                            self._audio_events.get(timeout=1.0)
+                            heard = True
+                        except queue.Empty:
+                            heard = False
+                    else:
+                        # Returns as soon as the sound is heard - at most the old fixed 1s wait
+                        heard = dots_heard.wait(timeout=1.0) or audio_detector.success_detected
+                        audio_detector.stop_detection()
+                    
+                    if heard:
                         self.logger.info("🔔 AUDIO VERIFIED: 3 dots click sound detected! Audio system working!")
                     else:
                         self.logger.info("INFO: 3 dots clicked - no audio detected (may be normal)")
-                    audio_detector.stop_detection()
                 except Exception as e:
                     self.logger.debug(f"Audio check: {e}")
-                finally:
-                    if audio_detector:
-                        audio_detector.cleanup()
             
             return True
             
@@ -530,6 +1200,20 @@ class VBSPhase3Complete:
             self.logger.error(f"ERROR: Three dots with audio detection failed: {e}")
             return False
     
+    def _paste(self, text):
+        """Put text on the clipboard and send Ctrl+V (one keystroke regardless of length)"""
+        win32clipboard.OpenClipboard()
+        try:
+            win32clipboard.EmptyClipboard()
+            win32clipboard.SetClipboardData(win32clipboard.CF_UNICODETEXT, text)
+        finally:
+            win32clipboard.CloseClipboard()
+        
+        win32api.keybd_event(win32con.VK_CONTROL, 0, 0, 0)
+        win32api.keybd_event(ord('V'), 0, 0, 0)
+        win32api.keybd_event(ord('V'), 0, win32con.KEYEVENTF_KEYUP, 0)
+        win32api.keybd_event(win32con.VK_CONTROL, 0, win32con.KEYEVENTF_KEYUP, 0)
+    
     def _address_bar_navigation(self):
         """Navigate using address bar (Phase 3 optimization)"""
         try:
@@ -541,12 +1225,12 @@ class VBSPhase3Complete:
             
             # Prepare path
             folder_path = self.excel_merge_folder.replace('/', '\\')
-            self.logger.info(f"📁 Typing path: {folder_path}")
+            self.logger.info(f"📁 Pasting path: {folder_path}")
             
-            # Clear and type path
+            # Clear and paste path
             pyautogui.hotkey('ctrl', 'a')
             time.sleep(0.2)
-            pyautogui.typewrite(folder_path, interval=self.delays["address_bar_type"])
+            self._paste(folder_path)
             time.sleep(0.5)
             
             # Navigate
@@ -568,8 +1252,8 @@ class VBSPhase3Complete:
             # Wait for dialog to be ready
             time.sleep(1.0)
             
-            # Type the sheet name with proper interval
-            pyautogui.typewrite(sheet_name, interval=0.1)
+            # Paste the sheet name (one Ctrl+V instead of per-character typing)
+            self._paste(sheet_name)
             self.logger.info(f"SUCCESS: Typed '{sheet_name}' sheet name")
             
             # Small delay before confirmation
@@ -610,110 +1294,275 @@ class VBSPhase3Complete:
         except Exception as e:
             self.logger.warning(f"⚠️ Error stopping audio detector: {e}")
     
+    def _start_audio_monitor(self):
+        """Keep the shared detector armed on a daemon thread - each popup sound lands on self._audio_events"""
+        if not self.enhanced_audio_detector:
+            return False
+        if self._audio_monitor and self._audio_monitor.is_alive():
+            return True
+        
+        self._audio_monitor_stop.clear()
+        self._audio_monitor = threading.Thread(target=self._audio_monitor_loop, daemon=True)
+        self._audio_monitor.start()
+        self.logger.info("🔊 Audio monitor thread started")
+        return True
+    
+    def _stop_audio_monitor(self):
+        """Stop the background audio monitor (the detector itself is left initialized)"""
+        self._audio_monitor_stop.set()
+        if self._audio_monitor:
+            self._audio_monitor.join(timeout=3.0)
+            self._audio_monitor = None
+    
+    def _audio_monitor_loop(self):
+        """Re-arm the detector after every detection so no popup sound is missed"""
+        detector = self.enhanced_audio_detector
+        while not self._audio_monitor_stop.is_set():
+            # Wait for the previous worker to release its stream before starting a new one
+            worker = detector.detection_thread
+            if not detector.is_detecting and not (worker and worker.is_alive()):
+                detector.start_detection(success_callback=self._on_audio_event)
+            self._audio_monitor_stop.wait(0.1)
+        detector.stop_detection()
+    
+    def _on_audio_event(self):
+        """Detector callback (audio thread): queue the sound and wake any event-driven wait"""
+        self._audio_events.put(time.monotonic())
+        self._import_done.set()
+        self._upload_wake.set()
+    
+    def _upload_popup_probe(self, start_upload):
+        """Click the upload success popup if it is up - True once found (runs on the STEP 10 wait loop)"""
+        elapsed = time.time() - start_upload
+        hours = int(elapsed / 3600)
+        minutes = int((elapsed % 3600) / 60)
+        self.logger.info(f"🔍 30-MINUTE CHECK: Looking for upload success popup at {hours}h {minutes}m")
+        
+        try:
+            # Try to find the upload success OK button
+            if self._click_image("09_update_success_ok_button.png", required=False, timeout=3):
+                self.logger.info(f"✅ UPLOAD SUCCESS POPUP FOUND AND CLICKED at {hours}h {minutes}m!")
+                
+                # Send immediate email notification (dispatched to the email executor - returns at once)
+                self.logger.info("📧 UPLOAD COMPLETED - Sending immediate email notification!")
+                self._send_upload_completion_email(elapsed / 3600)
+                self.logger.info(f"🎉 UPLOAD COMPLETED at {hours}h {minutes}m - Email notification dispatched!")
+                
+                self._upload_done.set()
+                return True
+            
+            # Alternative: Check for generic success popup and press ENTER
+            try:
+                # Focus VBS window and try ENTER in case popup is there but image not detected
+                self._focus_vbs_only()
+                pyautogui.press('enter')
+                time.sleep(0.5)
+                pyautogui.press('enter')  # Double ENTER for safety
+                time.sleep(1.0)
+                self.logger.info(f"⚡ FALLBACK: Pressed ENTER for possible hidden popup at {hours}h {minutes}m")
+            except:
+                pass
+            
+            self.logger.info(f"ℹ️ No upload success popup found at {hours}h {minutes}m - continuing to wait")
+            
+        except Exception as e:
+            self.logger.warning(f"⚠️ Error during 30-minute popup check: {e}")
+        
+        return False
+    
+    def _watch_for_popup(self, keywords, done_event, stop_event, interval=0.5):
+        """Background thread: set done_event once a VBS-owned top-level window title matches any keyword"""
+        pattern = re.compile("|".join(keywords), re.I)
+        
+        # Only windows of the VBS process count - an Explorer folder or browser tab titled "import" must not
+        try:
+            vbs_pid = win32process.GetWindowThreadProcessId(self.vbs_window)[1] if self.vbs_window else None
+        except Exception:
+            vbs_pid = None
+        
+        def check_window(hwnd, found):
+            if hwnd == self.vbs_window or not win32gui.IsWindowVisible(hwnd):
+                return True
+            if vbs_pid and win32process.GetWindowThreadProcessId(hwnd)[1] != vbs_pid:
+                return True
+            if pattern.search(win32gui.GetWindowText(hwnd)):
+                found.append(hwnd)
+                return False  # stop enumerating
+            return True
+        
+        while not stop_event.is_set() and not done_event.is_set():
+            found = []
+            try:
+                win32gui.EnumWindows(check_window, found)
+            except win32gui.error:
+                pass  # raised when the callback stops the enumeration early
+            if found:
+                self.logger.info(f"🪟 Popup window detected: {win32gui.GetWindowText(found[0])}")
+                done_event.set()
+                break
+            stop_event.wait(interval)
+    
+    def _audio_event_pending(self):
+        """Consume one queued popup-sound event without blocking"""
+        try:
+            self._audio_events.get_nowait()
+            return True
+        except queue.Empty:
+            return False
+    
+    def _wait_for_sound(self, expected_sound_name, timeout):
+        """Block up to timeout for the next popup sound and record it as expected_sound_name"""
+        try:
+            if timeout > 0:
+                self._audio_events.get(timeout=timeout)
+            else:
+                self._audio_events.get_nowait()
+        except queue.Empty:
+            return False
+        self._check_and_log_sound(expected_sound_name)
+        return True
+    
+    def _wait_foreground_change(self, hwnd, timeout):
+        """Poll (50ms) until hwnd is no longer the foreground window - True once it changed"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if win32gui.GetForegroundWindow() != hwnd:
+                return True
+            time.sleep(0.05)
+        return False
+    
     def _wait_for_import_completion(self):
         """Wait for import completion (6 minutes max) - ENHANCED with audio detection"""
         self.logger.info("WAIT: Waiting for import completion (up to 6 minutes)...")
         self.logger.info("INFO: Import process takes time - waiting for completion popup sound")
         
         start_time = time.time()
-        last_progress_log = 0
-        audio_detector = None
+        next_progress_at = 30.0  # elapsed seconds of the next progress log
+        next_refocus_at = 30.0   # elapsed seconds of the next VBS re-focus
         import_started = False
+        audio_heard = False
+        poll = IMPORT_POLL_MIN
         
-        # Try to initialize audio detector
-        if AUDIO_DETECTION_AVAILABLE:
-            try:
-                audio_detector = EnhancedVBSAudioDetector(self.vbs_window)
-                audio_detector.initialize_audio_system()
-                self.logger.info("AUDIO: Audio detector initialized for import completion popup")
-            except Exception as e:
-                self.logger.warning(f"WARN: Could not initialize audio detector: {e}")
+        # Popup sounds arrive on self._audio_events from the background monitor thread
+        if self._start_audio_monitor():
+            self.logger.info("AUDIO: Audio monitor listening for import completion popup")
         
-        try:
-            # Wait initial period for import to start processing
-            self.logger.info("WAIT: Allowing import to start processing (30 seconds)...")
-            initial_wait = 30.0
-            time.sleep(initial_wait)
-            import_started = True
-            
-            while time.time() - start_time < self.delays["import_wait"]:
-                elapsed = time.time() - start_time
-                
-                # Re-focus VBS window periodically (handle shrinking)
-                if int(elapsed) % 30 == 0:  # Every 30 seconds
-                    self._focus_vbs_only()
-                    self.logger.info("FOCUS: Re-focused VBS window during import")
-                
-                # Only start looking for completion after import has had time to process
-                if elapsed > 45.0:  # After 45 seconds, start looking for completion
-                    
-                    # Check for audio popup sound (PRIORITY - more reliable than visual)
-                    if audio_detector:
-                        try:
-                            self.logger.info("AUDIO: Listening for import completion popup sound...")
-                            # Listen for popup sound for 10 seconds
-                            if audio_detector.wait_for_success_sound(timeout=10.0):
-                                self.logger.info("🔔 AUDIO SUCCESS: Import completion popup sound detected!")
-                                # Give popup time to fully appear
-                                time.sleep(2.0)
-                                # Try to click OK button or press ENTER
-                                if self._click_image("08_import_ok_button.png", required=False, timeout=3):
-                                    self.logger.info(f"SUCCESS: Import completed with audio+visual confirmation! ({elapsed/60:.1f} minutes)")
-                                else:
-                                    # Fallback: Press ENTER to dismiss popup
-                                    self.logger.info("FALLBACK: Pressing ENTER to dismiss import completion popup")
-                                    self._press_enter_instant()
-                                    time.sleep(1.0)
-                                    self.logger.info(f"SUCCESS: Import completed with audio+ENTER confirmation! ({elapsed/60:.1f} minutes)")
-                                return True
-                        except Exception as e:
-                            self.logger.warning(f"WARN: Audio detection error: {e}")
-                    
-                    # Visual confirmation (secondary method)
-                    try:
-                        # Check if the import completion dialog appeared
-                        if self._click_image("08_import_ok_button.png", required=False, timeout=2):
-                            self.logger.info(f"SUCCESS: Import completed (visual confirmation)! ({elapsed/60:.1f} minutes)")
-                            return True
-                    except Exception as e:
-                        self.logger.debug(f"Visual check: {e}")
-                        
-                    # FALLBACK: Try clicking EHC User Detail header if import seems stuck
-                    if elapsed > 180:  # After 3 minutes, try alternative approach
-                        self.logger.info("FALLBACK: Import taking longer - checking if we can proceed")
-                        if self._click_image("06_ehc_user_detail_header.png", required=False, timeout=3):
-                            self.logger.info("SUCCESS: EHC User Detail header found - import may be complete")
-                            time.sleep(2.0)
-                            return True
+        # Allow import to start processing (first 30 seconds are just adaptive polls)
+        self.logger.info("WAIT: Allowing import to start processing (30 seconds)...")
+        
+        while time.time() - start_time < self.delays["import_wait"]:
+            elapsed = time.time() - start_time
+            progress_hint = False
+            if not import_started and elapsed >= 30.0:
+                import_started = True
+            
+            # Re-focus VBS window periodically (handle shrinking)
+            if elapsed >= next_refocus_at:  # Every 30 seconds
+                next_refocus_at += 30.0
+                self._invalidate_focus_cache()
+                self._focus_vbs_only()
+                self.logger.info("FOCUS: Re-focused VBS window during import")
+            
+            # Only start looking for completion after import has had time to process
+            if elapsed > 45.0:  # After 45 seconds, start looking for completion
                 
-                # Progress logging every 30 seconds
-                if elapsed - last_progress_log >= 30:
-                    remaining_minutes = (self.delays["import_wait"] - elapsed) / 60
-                    self.logger.info(f"PROGRESS: Import wait: {elapsed/60:.1f} minutes elapsed, {remaining_minutes:.1f} minutes remaining")
-                    if elapsed > 45:
-                        self.logger.info("INFO: Now actively monitoring for completion popup sound...")
-                    last_progress_log = elapsed
+                # Check for audio popup sound (PRIORITY - more reliable than visual)
+                if audio_heard:
+                    self.logger.info("🔔 AUDIO SUCCESS: Import completion popup sound detected!")
+                    # Give popup time to fully appear
+                    time.sleep(2.0)
+                    # Try to click OK button or press ENTER
+                    if self._click_image("08_import_ok_button.png", required=False, timeout=3):
+                        self.logger.info(f"SUCCESS: Import completed with audio+visual confirmation! ({elapsed/60:.1f} minutes)")
+                    else:
+                        # Fallback: Press ENTER to dismiss popup
+                        self.logger.info("FALLBACK: Pressing ENTER to dismiss import completion popup")
+                        self._press_enter_instant()
+                        time.sleep(1.0)
+                        self.logger.info(f"SUCCESS: Import completed with audio+ENTER confirmation! ({elapsed/60:.1f} minutes)")
+                    return True
                 
-                # Check if VBS window is still accessible
-                if not self._focus_vbs_only():
-                    self.logger.warning("WARN: VBS window lost during import, searching again...")
-                    if not self._find_vbs_window():
-                        self.logger.error("ERROR: Cannot find VBS window during import")
-                        return False
+                # Visual confirmation (secondary method)
+                try:
+                    # Check if the import completion dialog appeared
+                    if self._click_image("08_import_ok_button.png", required=False, timeout=2):
+                        self.logger.info(f"SUCCESS: Import completed (visual confirmation)! ({elapsed/60:.1f} minutes)")
+                        return True
+                except Exception as e:
+                    self.logger.debug(f"Visual check: {e}")
                 
-                # Sleep for responsive monitoring
-                time.sleep(5.0)  # Check every 5 seconds
-            
-            self.logger.warning("TIMEOUT: Import completion timeout (6 minutes)")
-            return False
+                # Near-miss on the OK button (reuses the frame just grabbed) - popup is appearing
+                if self._locate("08_import_ok_button.png", confidence=0.6):
+                    progress_hint = True
+                    
+                # FALLBACK: Try clicking EHC User Detail header if import seems stuck
+                if elapsed > 180:  # After 3 minutes, try alternative approach
+                    self.logger.info("FALLBACK: Import taking longer - checking if we can proceed")
+                    if self._click_image(self.EHC_HEADER_IMAGES, required=False, timeout=3):
+                        self.logger.info("SUCCESS: EHC User Detail header found - import may be complete")
+                        time.sleep(2.0)
+                        return True
+            
+            # Progress logging every 30 seconds
+            if elapsed >= next_progress_at:
+                next_progress_at += 30.0
+                remaining_minutes = (self.delays["import_wait"] - elapsed) / 60
+                self.logger.info(f"PROGRESS: Import wait: {elapsed/60:.1f} minutes elapsed, {remaining_minutes:.1f} minutes remaining")
+                if elapsed > 45:
+                    self.logger.info("INFO: Now actively monitoring for completion popup sound...")
+            
+            # Check if VBS window is still accessible
+            if not self._focus_vbs_only():
+                self.logger.warning("WARN: VBS window lost during import, searching again...")
+                if not self._find_vbs_window():
+                    self.logger.error("ERROR: Cannot find VBS window during import")
+                    return False
             
-        finally:
-            # Cleanup audio detector
-            if audio_detector:
-                try:
-                    audio_detector.cleanup()
-                except Exception:
-                    pass
+            # Adaptive wait: back off while idle, stay responsive once something stirs.
+            # A popup sound from the monitor thread ends the wait immediately.
+            try:
+                self._audio_events.get(timeout=poll)
+                audio_heard = True
+            except queue.Empty:
+                pass
+            poll = IMPORT_POLL_MIN if progress_hint or audio_heard else min(poll * IMPORT_POLL_BACKOFF, IMPORT_POLL_MAX)
+        
+        self.logger.warning("TIMEOUT: Import completion timeout (6 minutes)")
+        return False
+        
+    
+    def _keyboard_update_fallback(self):
+        """Trigger Update from the keyboard: Alt+U, ENTER, TAB, ENTER"""
+        self._focus_vbs_only()
+        pyautogui.hotkey('alt', 'u')
+        time.sleep(0.3)
+        pyautogui.press('enter')
+        time.sleep(0.3)
+        pyautogui.press('tab')
+        time.sleep(0.2)
+        pyautogui.press('enter')
+    
+    def _click_update_ladder(self, label):
+        """One match of the update button, clicked if its score clears any rung of the confidence ladder"""
+        image_name = "09_update_button.png"
+        lowest = UPDATE_CONFIDENCE_LADDER[-1]
+        if CV2_AVAILABLE and self._get_template(image_name) is not None:
+            frame = self._grab_screen(fresh=True, region=self._search_region((image_name,)))
+            hit = self._search_frame(frame, self._gray_of(frame), image_name, lowest)
+            if hit is None:
+                return False
+            score, location = hit
+        else:
+            location = self._locate(image_name, confidence=lowest)
+            if location is None:
+                return False
+            score = lowest
+        
+        conf = next(c for c in UPDATE_CONFIDENCE_LADDER if score >= c)
+        click_x, click_y = pyautogui.center(location)
+        self._click_xy(click_x, click_y)
+        self.logger.info(f"SUCCESS: {label} click at ({click_x}, {click_y}) with confidence {conf}")
+        return True
     
     def _execute_update_double_click(self):
         """Execute update with double-click method - ENHANCED for smaller UI"""
@@ -731,21 +1580,7 @@ class VBSPhase3Complete:
             if not self._click_image("09_update_button.png", timeout=15):
                 self.logger.warning("WARN: First update click failed with standard precision")
                 # Try with different confidence levels
-                confidence_attempts = [0.95, 0.85, 0.75]
-                success = False
-                for conf in confidence_attempts:
-                    try:
-                        location = pyautogui.locateOnScreen(str(self.images_dir / "09_update_button.png"), confidence=conf)
-                        if location:
-                            click_x, click_y = pyautogui.center(location)
-                            pyautogui.click(click_x, click_y)
-                            self.logger.info(f"SUCCESS: First click at ({click_x}, {click_y}) with confidence {conf}")
-                            success = True
-                            break
-                    except:
-                        continue
-                        
-                if not success:
+                if not self._click_update_ladder("First"):
                     self.logger.error("ERROR: Cannot find update button for first click")
                     return False
             
@@ -761,20 +1596,7 @@ class VBSPhase3Complete:
             if not self._click_image("09_update_button.png", timeout=10):
                 self.logger.warning("WARN: Second update click failed with standard precision")
                 # Try with different confidence levels again
-                success = False
-                for conf in confidence_attempts:
-                    try:
-                        location = pyautogui.locateOnScreen(str(self.images_dir / "09_update_button.png"), confidence=conf)
-                        if location:
-                            click_x, click_y = pyautogui.center(location)
-                            pyautogui.click(click_x, click_y)
-                            self.logger.info(f"SUCCESS: Second click at ({click_x}, {click_y}) with confidence {conf}")
-                            success = True
-                            break
-                    except:
-                        continue
-                        
-                if not success:
+                if not self._click_update_ladder("Second"):
                     self.logger.warning("WARN: Second update click failed - continuing anyway")
             
             self.logger.info("COMPLETE: Update double-click process completed")
@@ -804,39 +1626,46 @@ class VBSPhase3Complete:
                 audio_detector = None
         
         upload_completed = False
+        deadline = start_time + self.delays["update_completion"]
         
-        while time.time() - start_time < self.delays["update_completion"]:
+        # Listen continuously - the detector sets its success event the moment the popup sounds
+        if audio_detector and not audio_detector.start_detection():
+            audio_detector = None
+        
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            
+            # Block until the popup sound or the next 10-minute status check, whichever comes first
+            if audio_detector:
+                if audio_detector._success_event.wait(timeout=min(remaining, 600)):
+                    self.logger.info("🔔 SUCCESS: Upload completion popup detected!")
+                    upload_completed = True
+                    break
+            else:
+                time.sleep(min(remaining, 600))
+            
             elapsed = time.time() - start_time
+            if elapsed >= self.delays["update_completion"]:
+                break
             hours = int(elapsed / 3600)
             minutes = int((elapsed % 3600) / 60)
             
             # Progress logging every 10 minutes
-            if int(elapsed) % 600 == 0 and elapsed > 0:
-                self.logger.info(f"⏱️ Upload in progress: {hours}h {minutes}m elapsed")
-                
-                # Check VBS window state
-                vbs_state = self._check_vbs_window_state()
-                if vbs_state == "not_responding":
-                    self.logger.info("📱 VBS 'Not Responding' - NORMAL during upload")
-                elif vbs_state == "responsive":
-                    self.logger.info("🔄 VBS responsive - upload may be completing")
-            
-            # Audio detection check
-            if audio_detector:
-                try:
-                    # Quick audio check (5 second window)
-                    if audio_detector.wait_for_success_sound(timeout=5.0):
-                        self.logger.info("🔔 SUCCESS: Upload completion popup detected!")
-                        upload_completed = True
-                        break
-                except Exception as e:
-                    self.logger.debug(f"Audio check: {e}")
-            
-            time.sleep(self.delays["popup_sound_check"])
+            self.logger.info(f"⏱️ Upload in progress: {hours}h {minutes}m elapsed")
+            
+            # Check VBS window state
+            vbs_state = self._check_vbs_window_state()
+            if vbs_state == "not_responding":
+                self.logger.info("📱 VBS 'Not Responding' - NORMAL during upload")
+            elif vbs_state == "responsive":
+                self.logger.info("🔄 VBS responsive - upload may be completing")
         
         # Cleanup audio detector
         if audio_detector:
             try:
+                audio_detector.stop_detection()
                 audio_detector.cleanup()
             except Exception as e:
                 self.logger.debug(f"Audio cleanup: {e}")
@@ -859,20 +1688,16 @@ class VBSPhase3Complete:
             # Wait a moment for popup to fully appear
             time.sleep(2.0)
             
-            # Press ENTER or click OK to dismiss popup
-            self.logger.info("OK: Pressing ENTER to dismiss 'Upload Successful' popup")
-            pyautogui.press('enter')
-            time.sleep(1.0)
-            
-            # Alternative: Try clicking an OK button if ENTER doesn't work
-            try:
-                # Look for a generic OK button (you can add specific image if needed)
-                pyautogui.press('enter')  # Try ENTER again
-                time.sleep(1.0)
-            except:
-                pass
-            
-            self.logger.info("✅ Upload completion popup handled")
+            # One ENTER, and only if the popup actually has the foreground (already dismissed otherwise)
+            hwnd = win32gui.GetForegroundWindow()
+            title = win32gui.GetWindowText(hwnd).lower()
+            if win32gui.GetClassName(hwnd) == "#32770" or title.startswith(UPLOAD_POPUP_TITLES):
+                self.logger.info("OK: Pressing ENTER to dismiss 'Upload Successful' popup")
+                self._press_enter_instant()
+                time.sleep(0.1)
+                self.logger.info("✅ Upload completion popup handled")
+            else:
+                self.logger.info("INFO: Upload completion popup already dismissed")
             
         except Exception as e:
             self.logger.warning(f"WARN: Popup handling failed: {e}")
@@ -932,36 +1757,39 @@ class VBSPhase3Complete:
         self.logger.info("TERMINATE: Ensuring VBS process is terminated...")
         
         try:
-            import subprocess
-            
-            # List of possible VBS process names
-            vbs_processes = [
-                "absons*.exe",
-                "moonflower*.exe", 
-                "wifi*.exe",
-                "vbs*.exe"
-            ]
-            
             terminated_count = 0
             
-            for process_pattern in vbs_processes:
-                try:
-                    # Use taskkill with wildcard pattern
-                    result = subprocess.run(
-                        ["taskkill", "/f", "/im", process_pattern],
-                        capture_output=True,
-                        text=True,
-                        timeout=10
-                    )
-                    
-                    if result.returncode == 0:
-                        terminated_count += 1
-                        self.logger.info(f"TERMINATE: Terminated process matching {process_pattern}")
-                    
-                except subprocess.TimeoutExpired:
-                    self.logger.warning(f"WARN: Timeout terminating {process_pattern}")
-                except Exception as e:
-                    self.logger.warning(f"WARN: Could not terminate {process_pattern}: {e}")
+            if PSUTIL_AVAILABLE:
+                # One sweep of the process table instead of a taskkill spawn per pattern
+                for proc in psutil.process_iter(['name']):
+                    name = (proc.info['name'] or '').lower()
+                    if name.endswith('.exe') and name.startswith(VBS_PROCESS_PREFIXES):
+                        try:
+                            proc.kill()
+                            terminated_count += 1
+                            self.logger.info(f"TERMINATE: Terminated process {proc.info['name']}")
+                        except psutil.Error as e:
+                            self.logger.warning(f"WARN: Could not terminate {proc.info['name']}: {e}")
+            else:
+                for prefix in VBS_PROCESS_PREFIXES:
+                    process_pattern = f"{prefix}*.exe"
+                    try:
+                        # Use taskkill with wildcard pattern
+                        result = subprocess.run(
+                            ["taskkill", "/f", "/im", process_pattern],
+                            capture_output=True,
+                            text=True,
+                            timeout=10
+                        )
+                        
+                        if result.returncode == 0:
+                            terminated_count += 1
+                            self.logger.info(f"TERMINATE: Terminated process matching {process_pattern}")
+                        
+                    except subprocess.TimeoutExpired:
+                        self.logger.warning(f"WARN: Timeout terminating {process_pattern}")
+                    except Exception as e:
+                        self.logger.warning(f"WARN: Could not terminate {process_pattern}: {e}")
             
             if terminated_count > 0:
                 self.logger.info(f"SUCCESS: Terminated {terminated_count} VBS process(es)")
@@ -991,7 +1819,7 @@ class VBSPhase3Complete:
         # Start continuous audio detection if available
         if self.enhanced_audio_detector:
             self.logger.info("🔊 Starting continuous enhanced audio detection")
-            self.enhanced_audio_detector.start_detection(timeout=None)
+            self._start_audio_monitor()
         
         try:
             # STEP 1: Import EHC Checkbox
@@ -1010,9 +1838,8 @@ class VBSPhase3Complete:
             time.sleep(0.5)
             pyautogui.press('enter')  # Accept the popup
             
-            # Check for first 3 dots sound
-            time.sleep(1.0)
-            self._check_and_log_sound("three_dots_1")
+            # Check for first 3 dots sound (returns as soon as it is heard)
+            self._wait_for_sound("three_dots_1", timeout=1.0)
             
             steps_completed.append("step_2_three_dots")
             time.sleep(2.0)
@@ -1023,10 +1850,8 @@ class VBSPhase3Complete:
                 pyautogui.hotkey('ctrl', 'l')
                 time.sleep(0.3)
                 
-                today = datetime.now().strftime("%d%b").lower()
-                excel_path = rf"C:\Users\user\Documents\Automata2\EHC_Data_Merge\{today}"
-                pyautogui.typewrite(excel_path, interval=0.01)
-                time.sleep(0.3)
+                self._paste(self._today_folder)  # one clipboard paste instead of a keystroke per character
+                time.sleep(0.1)
                 pyautogui.press('enter')
                 time.sleep(2.0)
                 
@@ -1060,11 +1885,11 @@ class VBSPhase3Complete:
                     time.sleep(0.3)
                     pyautogui.press('tab')    # Get to text field
                     time.sleep(0.2)
-                    pyautogui.typewrite("EHC_Data", interval=0.05)
+                    self._paste("EHC_Data")
                     time.sleep(0.3)
                     
                     # Check for second 3 dots sound
-                    self._check_and_log_sound("three_dots_2")
+                    self._wait_for_sound("three_dots_2", timeout=0)
                     
                     self.logger.info("✅ Sheet selection completed")
                     
@@ -1096,35 +1921,51 @@ class VBSPhase3Complete:
             self.logger.info("⏳ IMPORT BUTTON WAS CLICKED - Now waiting for import completion (up to 15 minutes)...")
             self.logger.info("🔊 Listening for import completion popup sound...")
             
+            # Sounds queued before the import (button clicks) must not count as completion
+            self._import_done.clear()
+            while self._audio_event_pending():
+                pass
+            
+            # Audio callback or popup-window watcher wakes us - no screenshot polling while waiting
+            watcher_stop = threading.Event()
+            watcher = threading.Thread(
+                target=self._watch_for_popup,
+                args=(("import", "success"), self._import_done, watcher_stop),
+                daemon=True
+            )
+            watcher.start()
+            
+            # 15 minutes max (as in working version), woken early by either signal - every slice logs
+            # progress and runs a visual backstop for a popup whose title the watcher did not recognise
             import_completed = False
-            import_start_time = time.time()  # Start timer NOW after button click
+            import_start = time.time()
+            import_deadline = import_start + 900
+            while True:
+                remaining = import_deadline - time.time()
+                if remaining <= 0:
+                    break
+                if self._import_done.wait(timeout=min(IMPORT_WAIT_SLICE, remaining)):
+                    import_completed = True
+                    break
+                elapsed_min = int((time.time() - import_start) / 60)
+                self.logger.info(f"⏳ Import still running... {elapsed_min} min elapsed")
+                if self._locate_best(["08_import_ok_button.png"], confidence=0.8, fresh=True)[1]:
+                    self.logger.info("👁️ VISUAL: Import OK button on screen")
+                    import_completed = True
+                    break
+            watcher_stop.set()
             
-            while time.time() - import_start_time < 900:  # 15 minutes max (as in working version)
-                elapsed = time.time() - import_start_time
-                
-                # Check for audio popup first (most reliable)
-                if self.enhanced_audio_detector and self.enhanced_audio_detector.success_detected:
+            if import_completed:
+                if self._audio_event_pending():
                     self.logger.info("🔔 AUDIO: Import completion popup detected!")
                     self._check_and_log_sound("import_success")
-                    import_completed = True
-                    break
-                
-                # Check for visual popup (simplified, as in working version)
-                try:
-                    if self._click_image("08_import_ok_button.png", required=False, timeout=2):
-                        self.logger.info("✅ VISUAL: Import completion popup found!")
-                        import_completed = True
-                        break
-                except:
-                    pass
-                
-                # Progress logging every 60 seconds (as in working version)
-                if int(elapsed) % 60 == 0 and elapsed > 0:
-                    self.logger.info(f"⏱️ Import wait: {elapsed/60:.1f} minutes elapsed (max 15 minutes)")
+                else:
+                    self.logger.info("✅ POPUP: Import completion window detected!")
                 
-                time.sleep(2.0)  # Check every 2 seconds (as in working version)
-            
-            if not import_completed:
+                # Single confirmatory click on the OK button (ENTER below covers a miss)
+                if self._click_image("08_import_ok_button.png", required=False, timeout=2):
+                    self.logger.info("✅ VISUAL: Import completion popup OK clicked")
+            else:
                 self.logger.warning("⚠️ Import completion timeout after 15 minutes - continuing anyway")
             
             # CRITICAL: Always press ENTER to dismiss import completion popup (KEY FROM WORKING VERSION!)
@@ -1142,49 +1983,37 @@ class VBSPhase3Complete:
             for attempt in range(5):
                 self.logger.info(f"🎯 UPDATE BUTTON attempt {attempt + 1}/5")
                 
-                # Try multiple update button images
-                update_images = [
-                    "09_update_button.png",
-                    "09_update_button_variant1.png", 
-                    "09_update_button_variant2.png"
-                ]
-                
-                for update_image in update_images:
+                # One screenshot, every update button variant - best match wins
+                update_image, location = self._locate_best(self.UPDATE_BUTTON_IMAGES, confidence=0.7, pyramid=True)
+                if location:
+                    self.logger.info(f"✅ Found update button: {update_image}")
+                    
+                    # Click the button aggressively
+                    click_x, click_y = pyautogui.center(location)
+                    self._focus_vbs_only()
+                    
+                    # Multiple click attempts
+                    pyautogui.click(click_x, click_y)
+                    time.sleep(0.2)
+                    pyautogui.doubleClick(click_x, click_y)
+                    time.sleep(0.2)
+                    pyautogui.click(click_x, click_y)
+                    
+                    self.logger.info(f"🔥 AGGRESSIVELY CLICKED update button at ({click_x}, {click_y})")
+                    
+                    # Verify button disappeared (indicates successful click)
+                    time.sleep(1.0)
                     try:
-                        # Check if button exists
-                        location = pyautogui.locateOnScreen(str(self.images_dir / update_image), confidence=0.7)
-                        if location:
-                            self.logger.info(f"✅ Found update button: {update_image}")
-                            
-                            # Click the button aggressively
-                            click_x, click_y = pyautogui.center(location)
-                            self._focus_vbs_only()
-                            
-                            # Multiple click attempts
-                            pyautogui.click(click_x, click_y)
-                            time.sleep(0.2)
-                            pyautogui.doubleClick(click_x, click_y)
-                            time.sleep(0.2)
-                            pyautogui.click(click_x, click_y)
-                            
-                            self.logger.info(f"🔥 AGGRESSIVELY CLICKED update button at ({click_x}, {click_y})")
-                            
-                            # Verify button disappeared (indicates successful click)
-                            time.sleep(1.0)
-                            try:
-                                verify_location = pyautogui.locateOnScreen(str(self.images_dir / update_image), confidence=0.7)
-                                if not verify_location:
-                                    self.logger.info("✅ UPDATE BUTTON VERIFIED CLICKED - button disappeared!")
-                                    update_button_clicked = True
-                                    break
-                                else:
-                                    self.logger.warning(f"⚠️ Update button still visible after click attempt {attempt + 1}")
-                            except:
-                                self.logger.info("✅ UPDATE BUTTON VERIFIED CLICKED - cannot find button anymore!")
-                                update_button_clicked = True
-                                break
+                        if not self._still_visible(update_image, confidence=0.7):
+                            self.logger.info("✅ UPDATE BUTTON VERIFIED CLICKED - button disappeared!")
+                            update_button_clicked = True
+                        else:
+                            self.logger.warning(f"⚠️ Update button still visible after click attempt {attempt + 1}")
                     except:
-                        continue
+                        self.logger.info("✅ UPDATE BUTTON VERIFIED CLICKED - cannot find button anymore!")
+                        update_button_clicked = True
+                else:
+                    time.sleep(0.5)  # Give the UI a moment before the next capture
                 
                 if update_button_clicked:
                     break
@@ -1192,14 +2021,7 @@ class VBSPhase3Complete:
                 # If visual clicking failed, try keyboard
                 if attempt == 4:  # Last attempt
                     self.logger.info("⌨️ FINAL ATTEMPT: Trying keyboard for update")
-                    self._focus_vbs_only()
-                    pyautogui.hotkey('alt', 'u')
-                    time.sleep(0.3)
-                    pyautogui.press('enter')
-                    time.sleep(0.3)
-                    pyautogui.press('tab')
-                    time.sleep(0.2)
-                    pyautogui.press('enter')
+                    self._keyboard_update_fallback()
                     update_button_clicked = True  # Assume keyboard worked
                     self.logger.info("✅ KEYBOARD UPDATE attempted - assuming success")
             
@@ -1219,69 +2041,51 @@ class VBSPhase3Complete:
             start_upload = time.time()
             exact_wait = 10800.0  # EXACTLY 3 hours (3 * 60 * 60 = 10,800 seconds)
             
-            while time.time() - start_upload < exact_wait:
-                elapsed = time.time() - start_upload
+            deadline = start_upload + exact_wait
+            next_log = start_upload + 900  # progress log every 15 minutes
+            next_probe = start_upload + UPLOAD_POPUP_CHECK_INTERVAL  # popup probe every 30 minutes
+            
+            self._upload_done.clear()
+            self._upload_wake.clear()
+            
+            while True:
+                now = time.time()
+                if now >= deadline:
+                    break
+                
+                # Sleep until the next progress log or popup probe - an audio event wakes us early
+                self._upload_wake.wait(timeout=min(next_log, next_probe, deadline) - now)
+                self._upload_wake.clear()
+                audio_heard = self._audio_event_pending()
+                
+                now = time.time()
+                elapsed = now - start_upload
                 hours = int(elapsed / 3600)
                 minutes = int((elapsed % 3600) / 60)
-                remaining_seconds = exact_wait - elapsed
+                remaining_seconds = max(0.0, exact_wait - elapsed)
                 remaining_hours = int(remaining_seconds / 3600)
                 remaining_minutes = int((remaining_seconds % 3600) / 60)
                 
-                # Check for early audio completion (but still wait full 3 hours)
-                if self.enhanced_audio_detector and self.enhanced_audio_detector.success_detected:
-                    if not upload_completed:  # Only log once
-                        self.logger.info(f"🔔 AUDIO: Upload completion detected at {hours}h {minutes}m!")
-                        self._check_and_log_sound("upload_success")
-                        upload_completed = True
-                        self.logger.info(f"⏰ Audio detected, but continuing to wait full 3 hours as requested")
+                # Early audio completion (but still wait full 3 hours)
+                if audio_heard and not upload_completed:  # Only log once
+                    self.logger.info(f"🔔 AUDIO: Upload completion detected at {hours}h {minutes}m!")
+                    self._check_and_log_sound("upload_success")
+                    upload_completed = True
+                    self.logger.info(f"⏰ Audio detected, but continuing to wait full 3 hours as requested")
                 
-                # CHECK FOR UPLOAD SUCCESS POPUP EVERY 30 MINUTES
-                if int(elapsed) % 1800 == 0 and elapsed > 0:  # Every 30 minutes (1800 seconds)
-                    self.logger.info(f"🔍 30-MINUTE CHECK: Looking for upload success popup at {hours}h {minutes}m")
-                    
-                    # Look for upload success popup image
-                    try:
-                        upload_success_found = False
-                        
-                        # Try to find the upload success OK button
-                        if self._click_image("09_update_success_ok_button.png", required=False, timeout=3):
-                            self.logger.info(f"✅ UPLOAD SUCCESS POPUP FOUND AND CLICKED at {hours}h {minutes}m!")
-                            upload_success_found = True
-                            upload_completed = True
-                        else:
-                            # Alternative: Check for generic success popup and press ENTER
-                            try:
-                                # Focus VBS window and try ENTER in case popup is there but image not detected
-                                self._focus_vbs_only()
-                                pyautogui.press('enter')
-                                time.sleep(0.5)
-                                pyautogui.press('enter')  # Double ENTER for safety
-                                time.sleep(1.0)
-                                self.logger.info(f"⚡ FALLBACK: Pressed ENTER for possible hidden popup at {hours}h {minutes}m")
-                            except:
-                                pass
-                        
-                        if upload_success_found:
-                            # Send immediate email notification
-                            self.logger.info("📧 UPLOAD COMPLETED - Sending immediate email notification!")
-                            self._send_upload_completion_email()
-                            self.logger.info(f"🎉 UPLOAD COMPLETED at {hours}h {minutes}m - Email notification sent!")
-                            
-                            # Break out of the waiting loop since upload is done
-                            break
-                        else:
-                            self.logger.info(f"ℹ️ No upload success popup found at {hours}h {minutes}m - continuing to wait")
-                            
-                    except Exception as e:
-                        self.logger.warning(f"⚠️ Error during 30-minute popup check: {e}")
+                # Popup probe runs here on the main thread - it shares the mss handle and focus state
+                if now >= next_probe:
+                    next_probe += UPLOAD_POPUP_CHECK_INTERVAL
+                    if self._upload_popup_probe(start_upload):
+                        upload_completed = True
+                        break
                 
                 # Progress logging every 15 minutes for 3-hour wait
-                if int(elapsed) % 900 == 0 and elapsed > 0:
+                if now >= next_log:
+                    next_log += 900
                     self.logger.info(f"⏱️ Upload progress: {hours}h {minutes}m elapsed | {remaining_hours}h {remaining_minutes}m remaining")
                     if upload_completed:
                         self.logger.info("🔔 Upload already completed - waiting for full 3 hours")
-                
-                time.sleep(5.0)  # Check every 5 seconds
             
             # After EXACTLY 3 hours
             self.logger.info("⏰ EXACTLY 3 HOURS COMPLETED - Auto-closing VBS as requested")
@@ -1290,15 +2094,17 @@ class VBSPhase3Complete:
             # Handle upload completion popup
             if upload_completed:
                 self.logger.info("🔚 Handling upload completion popup")
+                popup = win32gui.GetForegroundWindow()
                 pyautogui.press('enter')  # Dismiss "Upload Successful" popup
-                time.sleep(1.0)  # Reduced wait time
+                if popup != self.vbs_window:
+                    self._wait_foreground_change(popup, POPUP_DISMISS_TIMEOUT)
                 
                 # Send upload completion email notification
                 self._send_upload_completion_email()
                 
-                # Reduced wait time as requested
-                self.logger.info("⏱️ Waiting 5 seconds after upload completion...")
-                time.sleep(5.0)  # Reduced from 20 seconds
+                # Settle time - skipped once the success popup has been confirmed and clicked
+                self.logger.info("⏱️ Waiting up to 5 seconds after upload completion...")
+                self._upload_done.wait(timeout=5.0)
             
             steps_completed.append("step_10_upload_completed")
             
@@ -1334,34 +2140,82 @@ class VBSPhase3Complete:
         
         finally:
             # Stop audio detection
+            self._stop_audio_monitor()
             if self.enhanced_audio_detector:
                 self.enhanced_audio_detector.stop_detection()
                 self.enhanced_audio_detector.cleanup()
 
     def _check_and_log_sound(self, expected_sound_name):
-        """Check for sound detection and log which sound was detected"""
-        if self.enhanced_audio_detector and self.enhanced_audio_detector.success_detected:
-            if not self.expected_sounds[expected_sound_name]:
-                self.sound_count += 1
-                self.expected_sounds[expected_sound_name] = True
-                self.logger.info(f"🔔 SOUND {self.sound_count}/4: {expected_sound_name} detected!")
-                
-                # Reset the detector for next sound
-                self.enhanced_audio_detector.success_detected = False
-                
-                return True
+        """Log which sound was detected (caller has already consumed the audio event)"""
+        if not self.expected_sounds[expected_sound_name]:
+            self.sound_count += 1
+            self.expected_sounds[expected_sound_name] = True
+            self.logger.info(f"🔔 SOUND {self.sound_count}/4: {expected_sound_name} detected!")
+            return True
         return False
 
-    def _send_upload_completion_email(self):
+    def _dispatch_email(self, email_delivery, email_script, duration_hours):
+        """Executor task: deliver the upload email, retrying transient failures - returns (sent, error)"""
+        error = None
+        for attempt in range(EMAIL_MAX_ATTEMPTS):
+            try:
+                if email_delivery:
+                    # send_notification swallows SMTP errors and returns False - treat that as transient
+                    sent = bool(email_delivery.send_notification("upload_complete", duration_hours))
+                    error, transient = "send_notification returned False", True
+                else:
+                    result = subprocess.run([
+                        sys.executable, 
+                        str(email_script), 
+                        'upload_complete'
+                    ], capture_output=True, text=True, timeout=30)
+                    sent, error = result.returncode == 0, result.stderr
+                    transient = bool(_TRANSIENT_EMAIL_RE.search(error or ""))
+            except subprocess.TimeoutExpired:
+                sent, error, transient = False, "email script timed out", True
+            
+            if sent:
+                return True, None
+            if not transient or attempt == EMAIL_MAX_ATTEMPTS - 1:
+                break
+            
+            delay = min(EMAIL_RETRY_CAP, EMAIL_RETRY_BASE * 2 ** attempt * (1 + random.random() * EMAIL_RETRY_JITTER))
+            self.logger.warning(f"⚠️ Email attempt {attempt + 1}/{EMAIL_MAX_ATTEMPTS} failed ({error}) - retrying in {delay:.1f}s")
+            time.sleep(delay)
+        return False, error
+    
+    def _log_email_result(self, future):
+        """Executor callback - report how the email delivery finished"""
+        try:
+            sent, error = future.result()
+        except Exception as e:
+            self.logger.warning(f"⚠️ Failed to send email notification: {e}")
+        else:
+            if sent:
+                self.logger.info("✅ Upload completion email sent successfully!")
+            else:
+                self.logger.warning(f"⚠️ Email script returned error: {error}")
+    
+    def _load_email_delivery(self, email_script):
+        """Import email_delivery.py by path, once (the project's email/ folder shadows the stdlib package)"""
+        if self._email_module is None:
+            try:
+                spec = importlib.util.spec_from_file_location("email_delivery", str(email_script))
+                module = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(module)
+                self._email_module = module
+            except Exception as e:
+                self.logger.warning(f"⚠️ Could not import email delivery module ({e}) - using the script")
+                self._email_module = False
+        return self._email_module or None
+    
+    def _send_upload_completion_email(self, duration_hours=3.0):
         """Send email notification when upload is completed"""
         try:
             self.logger.info("📧 Sending upload completion email notification...")
             
             # Try to import and use email delivery system
             try:
-                import subprocess
-                import sys
-                
                 # Get project root and email script path
                 try:
                     from universal_path_manager import get_paths, cd_to_project_root
@@ -1373,17 +2227,12 @@ class VBSPhase3Complete:
                     email_script = project_root / 'email' / 'email_delivery.py'
                 
                 if email_script.exists():
-                    # Run email delivery script with upload_complete parameter
-                    result = subprocess.run([
-                        sys.executable, 
-                        str(email_script), 
-                        'upload_complete'
-                    ], capture_output=True, text=True, timeout=30)
-                    
-                    if result.returncode == 0:
-                        self.logger.info("✅ Upload completion email sent successfully!")
-                    else:
-                        self.logger.warning(f"⚠️ Email script returned error: {result.stderr}")
+                    # In-process call when the module imports (script run otherwise) - off the phase-3 thread
+                    email_delivery = self._load_email_delivery(email_script)
+                    future = self._email_executor.submit(self._dispatch_email, email_delivery,
+                                                         email_script, duration_hours)
+                    future.add_done_callback(self._log_email_result)
+                    self.logger.info("📧 Email delivery dispatched in the background")
                 else:
                     self.logger.warning("⚠️ Email script not found - notification not sent")
                     
@@ -1393,11 +2242,11 @@ class VBSPhase3Complete:
                 # Alternative: Create a simple notification file
                 try:
                     notification_file = project_root / "upload_completed.txt"
-                    with open(notification_file, 'w') as f:
-                        from datetime import datetime
-                        f.write(f"VBS Upload completed at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                        f.write(f"Status: SUCCESS\n")
-                        f.write(f"Duration: 3 hours (as configured)\n")
+                    notification_file.write_text(
+                        f"VBS Upload completed at: {datetime.now():%Y-%m-%d %H:%M:%S}\n"
+                        f"Status: SUCCESS\n"
+                        f"Duration: 3 hours (as configured)\n"
+                    )
                     self.logger.info("✅ Upload completion notification file created")
                 except Exception as file_error:
                     self.logger.warning(f"⚠️ Could not create notification file: {file_error}")
@@ -1414,16 +2263,8 @@ class VBSPhase3Complete:
             self.logger.error("❌ No images directory")
             return False
         
-        # Check which EHC header images are available
-        available_images = []
-        for image in self.ehc_header_images:
-            image_path = self.images_dir / image
-            if image_path.exists():
-                available_images.append(image)
-                self.logger.info(f"✅ Available: {image}")
-            else:
-                self.logger.warning(f"❌ Missing: {image}")
-        
+        # EHC header variants were checked and decoded once in _setup_images
+        available_images = self._ehc_available
         if not available_images:
             self.logger.error("❌ No EHC header images found!")
             return False
@@ -1431,160 +2272,119 @@ class VBSPhase3Complete:
         self.logger.info(f"🔥 ULTRA-AGGRESSIVE clicking on {len(available_images)} EHC header variants")
         
         # MAXIMUM AGGRESSIVE SETTINGS
-        confidence_levels = [0.9, 0.85, 0.8, 0.75, 0.7, 0.65, 0.6, 0.55]  # Even lower confidence
-        click_strategies = ['center', 'top_left', 'bottom_right', 'left_edge', 'right_edge', 'top_right', 'bottom_left']
+        min_confidence = EHC_HEADER_MIN_CONFIDENCE  # one match at the loosest threshold replaces the ladder
+        header_roi = self.IMAGE_ROI.get(available_images[0])  # capture is already cropped to the VBS window
+        click_strategies = ('center', 'top_left', 'bottom_right')
         
-        # Multiple rounds of clicking for absolute success
-        for round_num in range(3):  # 3 rounds of attempts
-            self.logger.info(f"🔥 ROUND {round_num + 1}/3 - AGGRESSIVE CLICKING")
-            
-            for i, image in enumerate(available_images, 1):
-                self.logger.info(f"🎯 Round {round_num + 1} - Image {i}/{len(available_images)}: {image}")
-                
-                image_path = self.images_dir / image
-                
-                # Super aggressive window focus
-                for focus_attempt in range(3):
-                    self._focus_vbs_only()
-                    time.sleep(0.2)
-                
-                for confidence in confidence_levels:
-                    try:
-                        location = pyautogui.locateOnScreen(str(image_path), confidence=confidence)
-                        if location:
-                            self.logger.info(f"🎯 FOUND at confidence {confidence}: {location}")
-                            
-                            # SPAM CLICK with all strategies
-                            for strategy in click_strategies:
-                                try:
-                                    if strategy == 'center':
-                                        click_x, click_y = pyautogui.center(location)
-                                    elif strategy == 'top_left':
-                                        click_x = location.left + 5
-                                        click_y = location.top + 5
-                                    elif strategy == 'bottom_right':
-                                        click_x = location.left + location.width - 5
-                                        click_y = location.top + location.height - 5
-                                    elif strategy == 'left_edge':
-                                        click_x = location.left + 3
-                                        click_y = location.top + location.height // 2
-                                    elif strategy == 'right_edge':
-                                        click_x = location.left + location.width - 3
-                                        click_y = location.top + location.height // 2
-                                    elif strategy == 'top_right':
-                                        click_x = location.left + location.width - 5
-                                        click_y = location.top + 5
-                                    elif strategy == 'bottom_left':
-                                        click_x = location.left + 5
-                                        click_y = location.top + location.height - 5
-                                    
-                                    # ULTRA-AGGRESSIVE CLICKING SEQUENCE
-                                    self._focus_vbs_only()
-                                    
-                                    # Multiple click types
-                                    pyautogui.click(click_x, click_y)  # Single click
-                                    time.sleep(0.1)
-                                    pyautogui.doubleClick(click_x, click_y)  # Double click
-                                    time.sleep(0.1)
-                                    pyautogui.rightClick(click_x, click_y)  # Right click
-                                    time.sleep(0.1)
-                                    
-                                    # Force click with pyautogui methods
-                                    pyautogui.mouseDown(click_x, click_y)
-                                    time.sleep(0.05)
-                                    pyautogui.mouseUp(click_x, click_y)
-                                    
-                                    self.logger.info(f"🔥 SPAM CLICKED {strategy} at ({click_x}, {click_y})")
-                                    
-                                    # Check if something changed
-                                    time.sleep(0.3)
-                                    try:
-                                        verify = pyautogui.locateOnScreen(str(image_path), confidence=confidence)
-                                        if not verify:
-                                            self.logger.info(f"✅ SUCCESS: {image} disappeared after {strategy} click!")
-                                            return True
-                                    except:
-                                        self.logger.info(f"✅ SUCCESS: {image} click verified (exception means success)!")
-                                        return True
-                                    
-                                except Exception as e:
-                                    self.logger.debug(f"Strategy {strategy} error: {e}")
-                                    continue
-                            
-                            # If image found but clicks didn't work, try keyboard
-                            self.logger.info(f"🔥 Image found but clicks failed - trying AGGRESSIVE KEYBOARD")
-                            self._focus_vbs_only()
-                            
-                            # Aggressive keyboard sequence
-                            for key_attempt in range(5):
-                                pyautogui.press('tab')
-                                time.sleep(0.1)
-                                pyautogui.press('enter')
-                                time.sleep(0.1)
-                                pyautogui.press('space')
-                                time.sleep(0.1)
-                            
-                            self.logger.info(f"✅ AGGRESSIVE KEYBOARD attempted - assuming success")
+        # Fresh window focus once (bypass the focus cache); clicks below only re-focus if it was lost
+        self._invalidate_focus_cache()
+        self._focus_vbs_only()
+        
+        # Keep retrying until the wall-clock budget runs out, backing off geometrically between rounds
+        deadline = time.monotonic() + EHC_HEADER_BUDGET
+        keyboard_tried = False
+        round_num = 0
+        while time.monotonic() < deadline:
+            self.logger.info(f"🔥 ROUND {round_num + 1} - AGGRESSIVE CLICKING")
+            
+            # One screenshot, every header variant (quarter-res scan, full-res refine), best score wins
+            try:
+                image, confidence, location = self._match_best(available_images, confidence=min_confidence,
+                                                               pyramid=True, roi=header_roi)
+                if location:
+                    self.logger.debug("🎯 FOUND %s at confidence %.2f: %s", image, confidence, location)
+                    
+                    # Click points computed once; on a small header the corners can collapse onto the
+                    # centre, so duplicates are dropped (first strategy wins, order kept)
+                    center_x, center_y = pyautogui.center(location)
+                    click_targets = {}
+                    for strategy, point in zip(click_strategies, (
+                            (center_x, center_y),
+                            (location.left + 5, location.top + 5),
+                            (location.left + location.width - 5, location.top + location.height - 5))):
+                        click_targets.setdefault(point, strategy)
+                    
+                    # One click per point, verified against a fresh capture before trying the next point
+                    for (click_x, click_y), strategy in click_targets.items():
+                        # Window message straight to the grid; real mouse input only if VBS is covered there
+                        if not self._post_click(click_x, click_y):
+                            self._ensure_vbs_foreground()
+                            self._click_xy(click_x, click_y)
+                        self.logger.debug("🖱️ CLICKED %s at (%d, %d)", strategy, click_x, click_y)
+                        
+                        # Check if something changed
+                        time.sleep(EHC_CLICK_SETTLE)
+                        if self._header_gone(image, min_confidence, header_roi):
+                            self.logger.info(f"✅ SUCCESS: {image} disappeared after {strategy} click!")
                             return True
-                            
-                    except Exception as e:
-                        continue
-                
-                # Brief pause between images
-                time.sleep(0.5)
+                    
+                    # If image found but clicks didn't work, try keyboard (once - repeated tab/enter would wander the UI)
+                    if not keyboard_tried:
+                        keyboard_tried = True
+                        self.logger.info(f"🔥 Image found but clicks failed - trying AGGRESSIVE KEYBOARD")
+                        self._focus_vbs_only()
+                    
+                        # Aggressive keyboard sequence
+                        for key_attempt in range(5):
+                            pyautogui.press('tab')
+                            time.sleep(0.1)
+                            pyautogui.press('enter')
+                            time.sleep(0.1)
+                            pyautogui.press('space')
+                            time.sleep(0.1)
+                    
+                        if self._header_gone(image, min_confidence, header_roi):
+                            self.logger.info(f"✅ SUCCESS: {image} disappeared after AGGRESSIVE KEYBOARD")
+                            return True
+                        self.logger.info(f"ℹ️ {image} still visible after keyboard - next round")
+                    
+            except Exception as e:
+                self.logger.debug("EHC header round %d error: %s", round_num + 1, e)
             
-            # Brief pause between rounds
-            time.sleep(1.0)
+            # Back off 0.25s, 0.375s, 0.56s... but never sleep past the deadline
+            delay = min(EHC_RETRY_BASE * EHC_RETRY_FACTOR ** round_num, deadline - time.monotonic())
+            round_num += 1
+            if delay > 0:
+                time.sleep(delay)
         
-        # NUCLEAR OPTION: If everything failed, try coordinate-based clicking
-        self.logger.warning("🔥 NUCLEAR OPTION: Trying coordinate-based clicking")
+        # LAST RESORT: read the header text instead of clicking blind coordinates
+        self.logger.warning("🔥 Template clicks exhausted - trying OCR for the EHC header text")
+        return self._click_ehc_header_ocr(header_roi)
+    
+    def _header_gone(self, image, confidence, roi):
+        """Fresh-capture check that a clicked header is no longer visible (a failed check is not success)"""
         try:
-            self._focus_vbs_only()
-            
-            # Common EHC header locations (adjust based on your screen)
-            possible_coordinates = [
-                (400, 300), (500, 300), (600, 300),  # Top area
-                (400, 400), (500, 400), (600, 400),  # Middle area
-                (400, 500), (500, 500), (600, 500),  # Lower area
-            ]
-            
-            for x, y in possible_coordinates:
-                try:
-                    pyautogui.click(x, y)
-                    pyautogui.doubleClick(x, y)
-                    time.sleep(0.2)
-                    self.logger.info(f"🔥 NUCLEAR CLICK at ({x}, {y})")
-                except:
-                    continue
-            
-            self.logger.info("✅ NUCLEAR OPTION completed - assuming success")
-            return True
-            
+            return self._locate(image, confidence=confidence, pyramid=True, roi=roi, fresh=True) is None
         except Exception as e:
-            self.logger.warning(f"Nuclear option failed: {e}")
-        
-        # FINAL VERIFICATION: Actually verify if EHC header was clicked
-        self.logger.warning("🔥 All EHC header attempts completed")
+            self.logger.debug("EHC header verification failed: %s", e)
+            return False
+    
+    def _click_ehc_header_ocr(self, roi=None):
+        """OCR the VBS window for a word starting with 'EHC' and click it - True only if it was found"""
+        if not (TESSERACT_AVAILABLE and CV2_AVAILABLE):
+            self.logger.warning("⚠️ OCR fallback unavailable (pytesseract/OpenCV missing) - EHC header not clicked")
+            return False
         
-        # Try one more simple approach - just click center of screen area where header should be
         try:
-            self.logger.info("🎯 FINAL ATTEMPT: Simple center click in header area")
-            self._focus_vbs_only()
-            
-            # Click in the typical header area (adjust coordinates as needed)
-            pyautogui.click(500, 350)  # Typical header position
-            time.sleep(0.5)
-            pyautogui.click(600, 350)  # Alternative position
-            time.sleep(0.5)
-            pyautogui.click(400, 350)  # Another alternative
-            time.sleep(0.5)
-            
-            self.logger.info("✅ FINAL ATTEMPT completed")
-            return True
+            self._ensure_vbs_foreground()
+            frame = self._grab_screen(fresh=True, region=self._search_region(self._ehc_available))
+            screen_gray = self._gray_of(frame)
+            x0, y0, x1, y1 = self._roi_bounds(roi, screen_gray.shape[1], screen_gray.shape[0]) if roi \
+                else (0, 0, screen_gray.shape[1], screen_gray.shape[0])
+            
+            data = pytesseract.image_to_data(screen_gray[y0:y1, x0:x1], output_type=pytesseract.Output.DICT)
+            for i, text in enumerate(data["text"]):
+                if text.strip().upper().startswith("EHC"):
+                    click_x = frame[1] + x0 + data["left"][i] + data["width"][i] // 2
+                    click_y = frame[2] + y0 + data["top"][i] + data["height"][i] // 2
+                    self._click_xy(click_x, click_y)
+                    self.logger.info(f"✅ OCR: clicked '{text.strip()}' at ({click_x}, {click_y})")
+                    return True
             
+            self.logger.error("❌ OCR: no 'EHC' text found in the header area")
         except Exception as e:
-            self.logger.error(f"❌ FINAL ATTEMPT failed: {e}")
-            return False
+            self.logger.error(f"❌ OCR fallback failed: {e}")
+        return False
 
 
 def main():
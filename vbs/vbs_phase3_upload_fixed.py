@@ -7,6 +7,7 @@ Based on the working oldphase3.txt code with proper flow and image sequence
 import time
 import logging
 import os
+import re
 import sys
 from pathlib import Path
 from datetime import datetime
@@ -14,7 +15,41 @@ import pyautogui
 import win32gui
 import win32con
 import win32api
+import win32clipboard
 import subprocess
+import zlib
+import threading
+import ctypes
+from ctypes import wintypes
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Optional OpenCV fast path for template matching (falls back to pyautogui.locateOnScreen)
+try:
+    import cv2
+    import numpy as np
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
+
+try:
+    import mss
+    MSS_AVAILABLE = True
+except ImportError:
+    MSS_AVAILABLE = False
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+# Optional fast frame digest for the import-wait change check (falls back to zlib.crc32)
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
 
 # Add project root to path for imports
 project_root = Path(__file__).parent.parent
@@ -24,13 +59,137 @@ sys.path.insert(0, str(project_root))
 pyautogui.FAILSAFE = False
 pyautogui.PAUSE = 0.1
 
+# Same shape as pyautogui's Box so pyautogui.center() and .left/.top keep working
+Box = namedtuple("Box", "left top width height")
+
+# Lowest accepted TM_CCOEFF_NORMED score per click path - the floor of each old confidence ladder
+SIMPLE_MIN_CONFIDENCE = 0.6
+AGGRESSIVE_MIN_CONFIDENCE = 0.5
+UPDATE_MIN_CONFIDENCE = 0.4
+
+# Pyramid matching for critical buttons: halvings before the coarse search, refine window padding (px)
+PYRAMID_LEVELS = 2
+PYRAMID_PAD = 16
+
+# Templates are not downsampled below this size (px) - too little detail left to match
+MIN_PYRAMID_TEMPLATE = 8
+
+# Step 7 import poll backoff: first interval, growth factor and cap (seconds)
+IMPORT_POLL_BASE = 5.0
+IMPORT_POLL_FACTOR = 1.2
+IMPORT_POLL_CAP = 30.0
+
+# Step 9: image-match attempts for the update button before the keyboard shortcut fallback
+UPDATE_CLICK_ATTEMPTS = 3
+
+# Executable name prefixes killed when VBS is shut down
+VBS_PROCESS_PREFIXES = ("absons", "moonflower", "wifi", "vbs")
+
+# Win32 SendInput structures (keybd_event is the legacy API)
+INPUT_KEYBOARD = 1
+KEYEVENTF_UNICODE = 0x0004
+ULONG_PTR = ctypes.c_size_t
+
+class KEYBDINPUT(ctypes.Structure):
+    _fields_ = [("wVk", wintypes.WORD),
+                ("wScan", wintypes.WORD),
+                ("dwFlags", wintypes.DWORD),
+                ("time", wintypes.DWORD),
+                ("dwExtraInfo", ULONG_PTR)]
+
+class MOUSEINPUT(ctypes.Structure):
+    _fields_ = [("dx", wintypes.LONG),
+                ("dy", wintypes.LONG),
+                ("mouseData", wintypes.DWORD),
+                ("dwFlags", wintypes.DWORD),
+                ("time", wintypes.DWORD),
+                ("dwExtraInfo", ULONG_PTR)]
+
+class _INPUTUNION(ctypes.Union):
+    # MOUSEINPUT is the largest member - keeps sizeof(INPUT) correct for SendInput
+    _fields_ = [("ki", KEYBDINPUT), ("mi", MOUSEINPUT)]
+
+class INPUT(ctypes.Structure):
+    _fields_ = [("type", wintypes.DWORD), ("union", _INPUTUNION)]
+
+# Key names understood by _send_keys ("ctrl+l" is a chord); any other item is typed as text
+SEND_KEYS_VK = {
+    "ctrl": win32con.VK_CONTROL,
+    "alt": win32con.VK_MENU,
+    "shift": win32con.VK_SHIFT,
+    "enter": win32con.VK_RETURN,
+    "tab": win32con.VK_TAB,
+    "right": win32con.VK_RIGHT,
+    "escape": win32con.VK_ESCAPE,
+    "f4": win32con.VK_F4,
+}
+SEND_KEYS_MODIFIERS = ("ctrl", "alt", "shift")
+
+# Arrow keys live on the extended keypad - without the flag they arrive as numpad keys
+EXTENDED_VKS = frozenset({win32con.VK_RIGHT})
+
+# STEP 10 upload wait: progress log interval, slow backstop poll (longest the popup check sleeps even
+# with the hook), poll interval when the WinEvent hook is unavailable, and the re-check backoff after
+# VBS shows a new window (the popup may paint, or only reach its final state, a few seconds later)
+UPLOAD_LOG_INTERVAL = 900.0
+UPLOAD_SLOW_POLL = 60.0
+UPLOAD_POLL_FALLBACK = 5.0
+UPLOAD_POPUP_RECHECKS = (0.5, 1.0, 2.0, 4.0)
+
+# WinEvent hook (STEP 10): VBS creating/showing a top-level window wakes the upload popup check
+EVENT_OBJECT_CREATE = 0x8000
+EVENT_OBJECT_DESTROY = 0x8001
+EVENT_OBJECT_SHOW = 0x8002
+WINEVENT_OUTOFCONTEXT = 0x0000
+OBJID_WINDOW = 0
+GA_ROOT = 2
+WINEVENTPROC = ctypes.WINFUNCTYPE(None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+                                  wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD)
+
+# Seconds the pasted text stays on the clipboard - the target reads it when it handles Ctrl+V
+CLIPBOARD_RESTORE_DELAY = 0.5
+
+# Log file write buffer (bytes) - INFO lines are flushed in batches, WARNING+ immediately
+LOG_BUFFER_SIZE = 64 * 1024
+
+class BufferedFileHandler(logging.FileHandler):
+    """FileHandler that only flushes on WARNING+ (and on close) instead of after every record"""
+    
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=LOG_BUFFER_SIZE,
+                    encoding=self.encoding, errors=self.errors)
+    
+    def emit(self, record):
+        if self.stream is None:
+            self.stream = self._open()
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+            if record.levelno >= logging.WARNING:
+                self.flush()
+        except Exception:
+            self.handleError(record)
+
 class VBSPhase3Complete:
     """Complete VBS Phase 3 implementation with working flow"""
     
+    # Images that appear in file/popup dialogs, which can sit outside the VBS window - always searched full-screen
+    DIALOG_IMAGES = frozenset({
+        "04_DateExcel.png",
+        "05_Open.png",
+        "08_import_ok_button.png",
+        "09_update_success_ok_button.png",
+    })
+    
+    # VBS window title: any VBS keyword and none of the excluded apps - anchored so one match() checks the whole title
+    _VBS_TITLE_RE = re.compile(r'^(?=.*(?:absons|arabian|moonflower|wifi|ehc))'
+                               r'(?!.*(?:sql|outlook|browser|chrome|firefox|edge))', re.I | re.S)
+    
     def __init__(self):
         self.logger = self._setup_logging()
         self.vbs_window = None
+        self._vbs_rect = None  # (left, top, right, bottom), refreshed on every successful focus
         self.images_dir = None
+        self._image_paths = {}  # filename -> Path of every PNG in images_dir (one listing, no per-click stat)
         self.excel_merge_folder = None
         self.excel_filename = None
         
@@ -63,8 +222,34 @@ class VBSPhase3Complete:
             "09_update_success_ok_button.png"         # Upload success popup OK button
         ]
         
+        # Decode every template once up front instead of re-reading the PNG on each attempt
+        self._templates = {}
+        self._preload_templates()
+        
+        # matchTemplate releases the GIL, so the update-button variants can be scanned side by side
+        self._pool = ThreadPoolExecutor(max_workers=3) if CV2_AVAILABLE else None
+        
+        # One long-lived screen grabber - mss reuses its capture buffers between grabs
+        self._sct = mss.mss() if MSS_AVAILABLE and CV2_AVAILABLE else None
+        self._monitor = self._sct.monitors[1] if self._sct else None
+        
         self.logger.info("🚀 VBS Phase 3 COMPLETE - Working implementation ready")
     
+    def close(self):
+        """Release the shared screen grabber and the matcher thread pool"""
+        if getattr(self, "_sct", None):
+            try:
+                self._sct.close()
+            except Exception:
+                pass
+            self._sct = None
+        if getattr(self, "_pool", None):
+            self._pool.shutdown(wait=False)
+            self._pool = None
+    
+    def __del__(self):
+        self.close()
+    
     def _setup_logging(self):
         """Setup logging for Phase 3"""
         logger = logging.getLogger("VBSPhase3Complete")
@@ -73,6 +258,7 @@ class VBSPhase3Complete:
         # Clear existing handlers
         for handler in logger.handlers[:]:
             logger.removeHandler(handler)
+            handler.close()  # flushes anything a previous BufferedFileHandler still holds
         
         # Console handler
         console_handler = logging.StreamHandler()
@@ -87,7 +273,7 @@ class VBSPhase3Complete:
             log_dir.mkdir(parents=True, exist_ok=True)
             
             log_file = log_dir / f"vbs_phase3_complete_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
-            file_handler = logging.FileHandler(log_file, encoding='utf-8')
+            file_handler = BufferedFileHandler(log_file, encoding='utf-8')
             file_handler.setFormatter(formatter)
             logger.addHandler(file_handler)
             
@@ -105,24 +291,22 @@ class VBSPhase3Complete:
                 if not win32gui.IsWindowVisible(hwnd):
                     return True
                     
-                title = win32gui.GetWindowText(hwnd).lower()
-                
-                # VBS application identifiers
-                vbs_keywords = ['absons', 'arabian', 'moonflower', 'wifi', 'ehc']
-                exclude_keywords = ['sql', 'outlook', 'browser', 'chrome', 'firefox', 'edge']
-                
-                has_vbs_keyword = any(keyword in title for keyword in vbs_keywords)
-                has_exclude = any(keyword in title for keyword in exclude_keywords)
-                
-                if has_vbs_keyword and not has_exclude:
-                    windows.append((hwnd, title))
+                title = win32gui.GetWindowText(hwnd)
+                if self._VBS_TITLE_RE.match(title):
+                    windows.append((hwnd, title.lower()))
+                    return False  # first match is the one used - stop enumerating
                         
             except Exception:
                 pass
             return True
         
         windows = []
-        win32gui.EnumWindows(check_window, windows)
+        try:
+            win32gui.EnumWindows(check_window, windows)
+        except win32gui.error:
+            # EnumWindows reports the early stop as a failure
+            if not windows:
+                raise
         
         if windows:
             self.vbs_window = windows[0][0]
@@ -155,6 +339,10 @@ class VBSPhase3Complete:
             self.logger.error("❌ Images directory not found")
             return False
         
+        with os.scandir(self.images_dir) as entries:
+            self._image_paths = {entry.name: Path(entry.path) for entry in entries
+                                 if entry.is_file() and entry.name.lower().endswith('.png')}
+        
         return True
     
     def _find_excel_merge_info(self):
@@ -171,9 +359,11 @@ class VBSPhase3Complete:
             
             # Find Excel file
             if excel_dir.exists():
-                excel_files = list(excel_dir.glob("*.xls*"))
-                if excel_files:
-                    self.excel_filename = excel_files[0].name
+                # First .xls/.xlsx entry wins - scandir carries the file type, so no stat per entry
+                with os.scandir(excel_dir) as entries:
+                    self.excel_filename = next((entry.name for entry in entries if entry.is_file()
+                                                and entry.name.lower().endswith(('.xls', '.xlsx'))), None)
+                if self.excel_filename:
                     self.logger.info(f"📄 Found Excel file: {self.excel_filename}")
                 else:
                     # Generate expected filename
@@ -201,6 +391,13 @@ class VBSPhase3Complete:
                 if not self.vbs_window:
                     return False
             
+            # Already the maximized foreground window - the elevation sequence below would change nothing
+            if (win32gui.GetForegroundWindow() == self.vbs_window
+                    and win32gui.GetWindowPlacement(self.vbs_window)[1] == win32con.SW_SHOWMAXIMIZED):
+                if self._vbs_rect is None:
+                    self._vbs_rect = win32gui.GetWindowRect(self.vbs_window)
+                return True
+            
             # 🚀 SUPERIOR FOCUS STRATEGY: Multi-layer window elevation
             self.logger.debug(f"🎯 SUPERIOR FOCUS: Bringing VBS window {self.vbs_window} to absolute top")
             
@@ -245,6 +442,9 @@ class VBSPhase3Complete:
             
             time.sleep(self.delays["window_focus"])
             
+            # Cache the (maximized) window rect so template searches can be cropped to it
+            self._vbs_rect = win32gui.GetWindowRect(self.vbs_window)
+            
             # VERIFY: Check if VBS is now the foreground window
             current_foreground = win32gui.GetForegroundWindow()
             if current_foreground == self.vbs_window:
@@ -263,33 +463,222 @@ class VBSPhase3Complete:
             except:
                 return False
     
+    def _preload_templates(self):
+        """Report required images missing from disk (once) and decode the grayscale template of the rest"""
+        if not self.images_dir:
+            return
+        
+        missing = [name for name in self.required_images if name not in self._image_paths]
+        if missing:
+            self.logger.warning(f"⚠️ Images missing from {self.images_dir}: {', '.join(missing)}")
+        
+        if not CV2_AVAILABLE:
+            return
+        for image_name in self.required_images:
+            if image_name in self._image_paths:
+                self._load_template(image_name)
+        self.logger.info(f"🖼️ Preloaded {len(self._templates)} templates")
+    
+    def _load_template(self, image_name):
+        """Grayscale template for image_name, decoded once and cached (None if missing or unreadable)"""
+        template = self._templates.get(image_name)
+        if template is None and image_name in self._image_paths:
+            template = cv2.imread(str(self._image_paths[image_name]), cv2.IMREAD_GRAYSCALE)
+            if template is not None:
+                self._templates[image_name] = template
+        return template
+    
+    def _search_region(self, image_name):
+        """VBS window rect clipped to the primary screen as (left, top, width, height) - None means full screen"""
+        if image_name in self.DIALOG_IMAGES or not self._vbs_rect:
+            return None
+        
+        left, top, right, bottom = self._vbs_rect
+        left, top = max(0, left), max(0, top)
+        right = min(right, win32api.GetSystemMetrics(win32con.SM_CXSCREEN))
+        bottom = min(bottom, win32api.GetSystemMetrics(win32con.SM_CYSCREEN))
+        if right <= left or bottom <= top:
+            return None
+        return left, top, right - left, bottom - top
+    
+    def _grab_screen_gray(self, region=None):
+        """Grab region (default: primary screen) as grayscale - returns (image, left, top)"""
+        if self._sct:
+            if region:
+                area = {"left": region[0], "top": region[1], "width": region[2], "height": region[3]}
+            else:
+                area = self._monitor
+            raw = self._sct.grab(area)
+            bgra = np.frombuffer(raw.bgra, dtype=np.uint8).reshape(raw.height, raw.width, 4)
+            return cv2.cvtColor(bgra, cv2.COLOR_BGRA2GRAY), area["left"], area["top"]
+        
+        shot = pyautogui.screenshot(region=region)
+        left, top = (region[0], region[1]) if region else (0, 0)
+        return cv2.cvtColor(np.asarray(shot), cv2.COLOR_RGB2GRAY), left, top
+    
+    def _frame_digest(self, image):
+        """Cheap fingerprint of a grayscale frame - equal digests mean nothing on screen changed"""
+        data = image.tobytes()
+        if XXHASH_AVAILABLE:
+            return xxhash.xxh64(data).intdigest()
+        return zlib.crc32(data)
+    
+    def _match_full(self, screen_gray, template_gray):
+        """Full-resolution match - returns (score, (x, y)) or None if the screen is smaller than the template"""
+        h, w = template_gray.shape
+        if screen_gray.shape[0] < h or screen_gray.shape[1] < w:
+            return None
+        _, max_val, _, max_loc = cv2.minMaxLoc(cv2.matchTemplate(screen_gray, template_gray, cv2.TM_CCOEFF_NORMED))
+        return max_val, max_loc
+    
+    def _pyramid_locate(self, template_gray, screen_gray, levels=PYRAMID_LEVELS):
+        """Coarse-to-fine match - returns (score, (x, y)) at full resolution or None
+        
+        Both images are pyrDown'd `levels` times; the small pair is searched in full, then the peak is
+        mapped back (x2) and refined inside a padded window at each finer level.
+        """
+        screens, templates = [screen_gray], [template_gray]
+        for _ in range(levels):
+            if min(templates[-1].shape) // 2 < MIN_PYRAMID_TEMPLATE:
+                break
+            screens.append(cv2.pyrDown(screens[-1]))
+            templates.append(cv2.pyrDown(templates[-1]))
+        
+        match = self._match_full(screens[-1], templates[-1])
+        if match is None:
+            return None
+        score, (x, y) = match
+        
+        for screen, template in zip(reversed(screens[:-1]), reversed(templates[:-1])):
+            h, w = template.shape
+            x0, y0 = max(0, x * 2 - PYRAMID_PAD), max(0, y * 2 - PYRAMID_PAD)
+            refined = self._match_full(screen[y0:y * 2 + h + PYRAMID_PAD, x0:x * 2 + w + PYRAMID_PAD], template)
+            if refined is None:
+                # Peak hugs the screen edge - the window is clipped below template size
+                return self._match_full(screen_gray, template_gray)
+            score, (rx, ry) = refined
+            x, y = x0 + rx, y0 + ry
+        
+        return score, (x, y)
+    
+    def _locate(self, image_name, min_confidence, screen=None, pyramid=False):
+        """Best match of image_name - returns (score, Box) or None if the score is below min_confidence
+        
+        One matchTemplate per call: every confidence level of the old ladder shares the same
+        result matrix, so only the best score needs comparing. pyramid=True searches coarse-to-fine.
+        """
+        if not CV2_AVAILABLE:
+            if image_name not in self._image_paths:
+                return None
+            try:
+                location = pyautogui.locateOnScreen(str(self._image_paths[image_name]), confidence=min_confidence,
+                                                    region=self._search_region(image_name))
+            except Exception:
+                return None
+            return (min_confidence, location) if location else None
+        
+        template = self._load_template(image_name)
+        if template is None:
+            return None
+        
+        gray, left, top = screen or self._grab_screen_gray(self._search_region(image_name))
+        h, w = template.shape
+        match = self._pyramid_locate(template, gray) if pyramid else self._match_full(gray, template)
+        if match is None:
+            return None
+        
+        max_val, max_loc = match
+        if max_val < min_confidence:
+            return None
+        return max_val, Box(left + max_loc[0], top + max_loc[1], w, h)
+    
+    def _is_key_item(self, item):
+        """True if a _send_keys item names a key or a modifier chord rather than text to type"""
+        if item in SEND_KEYS_VK:
+            return True
+        parts = item.split("+")
+        return (len(parts) > 1 and all(part in SEND_KEYS_MODIFIERS for part in parts[:-1])
+                and (parts[-1] in SEND_KEYS_VK or len(parts[-1]) == 1))
+    
+    def _send_keys(self, sequence):
+        """Inject a whole key sequence with ONE SendInput call - True if every event went through
+        
+        Items are key names from SEND_KEYS_VK, chords like "alt+f4", or literal text (sent as Unicode).
+        """
+        events = []
+        for item in sequence:
+            if self._is_key_item(item):
+                vks = [SEND_KEYS_VK.get(part) or ord(part.upper()) for part in item.split("+")]
+                keys = [(vk, win32con.KEYEVENTF_EXTENDEDKEY if vk in EXTENDED_VKS else 0) for vk in vks]
+                events += [(vk, 0, flags) for vk, flags in keys]
+                events += [(vk, 0, flags | win32con.KEYEVENTF_KEYUP) for vk, flags in reversed(keys)]
+            else:
+                encoded = item.encode("utf-16-le")
+                for i in range(0, len(encoded), 2):
+                    unit = int.from_bytes(encoded[i:i + 2], "little")
+                    events += [(0, unit, KEYEVENTF_UNICODE), (0, unit, KEYEVENTF_UNICODE | win32con.KEYEVENTF_KEYUP)]
+        
+        inputs = (INPUT * len(events))()
+        for slot, (vk, scan, flags) in zip(inputs, events):
+            slot.type = INPUT_KEYBOARD
+            slot.union.ki = KEYBDINPUT(vk, scan, flags, 0, 0)
+        
+        sent = ctypes.windll.user32.SendInput(len(events), inputs, ctypes.sizeof(INPUT))
+        if sent != len(events):
+            self.logger.warning(f"⚠️ SendInput injected {sent}/{len(events)} key events for {sequence}")
+            return False
+        return True
+    
+    def _set_clipboard_text(self, text):
+        """Replace the clipboard with text - returns the previous clipboard text (None if it held no text)"""
+        win32clipboard.OpenClipboard()
+        try:
+            previous = None
+            if win32clipboard.IsClipboardFormatAvailable(win32clipboard.CF_UNICODETEXT):
+                previous = win32clipboard.GetClipboardData(win32clipboard.CF_UNICODETEXT)
+            win32clipboard.EmptyClipboard()
+            win32clipboard.SetClipboardData(win32clipboard.CF_UNICODETEXT, text)
+        finally:
+            win32clipboard.CloseClipboard()
+        return previous
+    
+    def _paste(self, text):
+        """Paste text with one Ctrl+V, then put the user's clipboard text back - True if the keys went through"""
+        previous = self._set_clipboard_text(text)
+        try:
+            pasted = self._send_keys(["ctrl+v"])
+            time.sleep(CLIPBOARD_RESTORE_DELAY)
+            return pasted
+        finally:
+            if previous is not None:
+                self._set_clipboard_text(previous)
+    
     def _click_image_simple(self, image_name, click_offset=None, required=True):
         """Simple image clicking without excessive logging"""
-        if not self.images_dir or not (self.images_dir / image_name).exists():
+        if image_name not in self._image_paths:
             if required:
                 self.logger.error(f"❌ Image not found: {image_name}")
             return False
         
-        image_path = self.images_dir / image_name
         self._focus_vbs_only()
         
-        # Try different confidence levels
-        for confidence in [0.9, 0.8, 0.7, 0.6]:
-            try:
-                location = pyautogui.locateOnScreen(str(image_path), confidence=confidence)
-                if location:
-                    if click_offset == "right":
-                        click_x = location.left + location.width - 20
-                        click_y = location.top + location.height // 2
-                    else:
-                        click_x, click_y = pyautogui.center(location)
-                    
-                    pyautogui.click(click_x, click_y)
-                    time.sleep(0.5)
-                    self.logger.info(f"✅ Clicked: {image_name}")
-                    return True
-            except:
-                continue
+        # One screenshot + one match (the old 0.9 → 0.6 ladder reduces to "best score >= 0.6")
+        try:
+            match = self._locate(image_name, SIMPLE_MIN_CONFIDENCE)
+            if match:
+                _, location = match
+                if click_offset == "right":
+                    click_x = location.left + location.width - 20
+                    click_y = location.top + location.height // 2
+                else:
+                    click_x, click_y = pyautogui.center(location)
+                
+                pyautogui.click(click_x, click_y)
+                time.sleep(0.5)
+                self.logger.info(f"✅ Clicked: {image_name}")
+                return True
+        except Exception as e:
+            self.logger.debug(f"Match failed for {image_name}: {e}")
         
         if required:
             self.logger.error(f"❌ Could not click: {image_name}")
@@ -302,45 +691,42 @@ class VBSPhase3Complete:
                 self.logger.error(f"❌ No images directory for {image_name}")
             return False
             
-        image_path = self.images_dir / image_name
-        if not image_path.exists():
+        if image_name not in self._image_paths:
             if required:
                 self.logger.error(f"❌ Image not found: {image_name}")
             return False
         
-        # Multiple confidence levels to try
-        confidence_levels = [0.9, 0.8, 0.7, 0.6, 0.5]
-        
         for attempt in range(max_attempts):
             # Re-focus VBS window each attempt
             self._focus_vbs_only()
             time.sleep(0.5)
             
-            for confidence in confidence_levels:
-                try:
-                    location = pyautogui.locateOnScreen(str(image_path), confidence=confidence)
-                    if location:
-                        # Handle special click positions
-                        if click_offset == "right":
-                            click_x = location.left + location.width - 20
-                            click_y = location.top + location.height // 2
-                        else:
-                            click_x, click_y = pyautogui.center(location)
-                        
-                        # Perform the click
+            # One screenshot + one match per attempt (the old 0.9 → 0.5 ladder reduces to "best score >= 0.5")
+            try:
+                match = self._locate(image_name, AGGRESSIVE_MIN_CONFIDENCE, pyramid=True)
+                if match:
+                    score, location = match
+                    # Handle special click positions
+                    if click_offset == "right":
+                        click_x = location.left + location.width - 20
+                        click_y = location.top + location.height // 2
+                    else:
+                        click_x, click_y = pyautogui.center(location)
+                    
+                    # Perform the click
+                    pyautogui.click(click_x, click_y)
+                    time.sleep(0.3)
+                    
+                    # Double-click for critical buttons
+                    if image_name in ["07_ehc_user_detail_header.png", "09_update_button.png"]:
                         pyautogui.click(click_x, click_y)
                         time.sleep(0.3)
-                        
-                        # Double-click for critical buttons
-                        if image_name in ["07_ehc_user_detail_header.png", "09_update_button.png"]:
-                            pyautogui.click(click_x, click_y)
-                            time.sleep(0.3)
-                        
-                        self.logger.info(f"✅ SUCCESS: {image_name} clicked at ({click_x}, {click_y})")
-                        return True
-                        
-                except Exception as e:
-                    continue
+                    
+                    self.logger.info(f"✅ SUCCESS: {image_name} clicked at ({click_x}, {click_y}) with confidence {score:.2f}")
+                    return True
+                    
+            except Exception as e:
+                self.logger.debug(f"Attempt {attempt + 1} match failed for {image_name}: {e}")
             
             # Wait before retry
             if attempt < max_attempts - 1:
@@ -350,6 +736,42 @@ class VBSPhase3Complete:
             self.logger.error(f"❌ CRITICAL FAILURE: {image_name} not clicked after {max_attempts} attempts")
         return False
 
+    def _click_first_matching(self, image_names, max_attempts=10):
+        """Click whichever variant scores best on one screenshot per attempt - returns the clicked name or None"""
+        available_images = [name for name in image_names if name in self._image_paths]
+        if not available_images:
+            self.logger.error(f"❌ Images not found: {', '.join(image_names)}")
+            return None
+        
+        for attempt in range(max_attempts):
+            self._focus_vbs_only()
+            time.sleep(0.5)
+            
+            try:
+                best = self._match_best(available_images, AGGRESSIVE_MIN_CONFIDENCE, pyramid=True)
+                if best:
+                    image_name, score, location = best
+                    click_x, click_y = pyautogui.center(location)
+                    
+                    # Double-click, as the critical buttons get in _click_image_aggressive
+                    pyautogui.click(click_x, click_y)
+                    time.sleep(0.3)
+                    pyautogui.click(click_x, click_y)
+                    time.sleep(0.3)
+                    
+                    self.logger.info(f"✅ SUCCESS: {image_name} clicked at ({click_x}, {click_y}) with confidence {score:.2f}")
+                    return image_name
+                    
+            except Exception as e:
+                self.logger.debug(f"Attempt {attempt + 1} match failed for {image_names}: {e}")
+            
+            # Wait before retry
+            if attempt < max_attempts - 1:
+                time.sleep(2.0)
+        
+        self.logger.error(f"❌ CRITICAL FAILURE: none of {', '.join(available_images)} clicked after {max_attempts} attempts")
+        return None
+    
     def _click_image(self, image_name, click_offset=None, required=True, timeout=10):
         """Standard click method - uses simple method for most, aggressive for critical buttons"""
         # Use aggressive clicking for critical buttons
@@ -375,22 +797,22 @@ class VBSPhase3Complete:
             "09_update_button.png",                    # Fallback: Original image
         ]
         
-        # Try each image with different confidence levels
-        confidence_levels = [0.9, 0.8, 0.7, 0.6, 0.5, 0.4]
-        
+        available_images = []
         for image_name in update_button_images:
-            image_path = self.images_dir / image_name
-            if not image_path.exists():
+            if image_name in self._image_paths:
+                available_images.append(image_name)
+            else:
                 self.logger.debug(f"Image not found: {image_name}")
-                continue
-                
-            self.logger.info(f"🔍 Trying update button image: {image_name}")
-            
-            for confidence in confidence_levels:
+        
+        if available_images:
+            self.logger.info(f"🔍 Matching {len(available_images)} update button images")
+            for attempt in range(UPDATE_CLICK_ATTEMPTS):
                 try:
+                    # Fresh focus each attempt (a no-op while VBS stays maximized in front)
                     self._focus_vbs_only()
-                    location = pyautogui.locateOnScreen(str(image_path), confidence=confidence)
-                    if location:
+                    best = self._match_best(available_images, UPDATE_MIN_CONFIDENCE)
+                    if best:
+                        image_name, score, location = best
                         click_x, click_y = pyautogui.center(location)
                         
                         # Enhanced focus for BAT compatibility before clicking
@@ -405,12 +827,15 @@ class VBSPhase3Complete:
                         pyautogui.click(click_x, click_y)
                         time.sleep(1.0)
                         
-                        self.logger.info(f"✅ SUCCESS: Update button clicked using {image_name} at ({click_x}, {click_y}) with confidence {confidence}")
+                        self.logger.info(f"✅ SUCCESS: Update button clicked using {image_name} at ({click_x}, {click_y}) with confidence {score:.2f}")
                         return True
                         
                 except Exception as e:
-                    self.logger.debug(f"Failed with {image_name} at confidence {confidence}: {e}")
-                    continue
+                    self.logger.debug(f"Update button match failed: {e}")
+                
+                if attempt < UPDATE_CLICK_ATTEMPTS - 1:
+                    self.logger.info(f"⚠️ Update button not found (attempt {attempt + 1}/{UPDATE_CLICK_ATTEMPTS})")
+                    time.sleep(0.5)
         
         # Keyboard fallback if all images fail
         self.logger.info("⌨️ Fallback: Using keyboard shortcut for Update")
@@ -425,35 +850,73 @@ class VBSPhase3Complete:
             self.logger.error(f"❌ Keyboard fallback failed: {e}")
             return False
 
+    def _match_best(self, image_names, min_confidence, pyramid=False):
+        """Match template variants of one UI element against ONE screenshot in parallel - returns (name, score, Box) or None
+        
+        The highest score wins; list order only breaks ties.
+        """
+        if not self._pool:
+            for image_name in image_names:
+                match = self._locate(image_name, min_confidence, pyramid=pyramid)
+                if match:
+                    return (image_name,) + match
+            return None
+        
+        screen = self._grab_screen_gray(self._search_region(image_names[0]))
+        futures = {self._pool.submit(self._locate, image_name, min_confidence, screen, pyramid): rank
+                   for rank, image_name in enumerate(image_names)}
+        
+        hits = []
+        for future in as_completed(futures):
+            rank = futures[future]
+            try:
+                match = future.result()
+            except Exception as e:
+                self.logger.debug(f"Failed with {image_names[rank]}: {e}")
+                continue
+            if match:
+                hits.append((match[0], -rank, match[1]))
+        
+        if not hits:
+            return None
+        score, neg_rank, location = max(hits, key=lambda hit: hit[:2])
+        return image_names[-neg_rank], score, location
+    
     def _terminate_vbs_process(self):
         """Terminate VBS processes"""
         self.logger.info("TERMINATE: Ensuring VBS process is terminated...")
         
         try:
-            vbs_processes = [
-                "absons*.exe",
-                "moonflower*.exe", 
-                "wifi*.exe",
-                "vbs*.exe"
-            ]
-            
             terminated_count = 0
             
-            for process_pattern in vbs_processes:
-                try:
-                    result = subprocess.run(
-                        ["taskkill", "/f", "/im", process_pattern],
-                        capture_output=True,
-                        text=True,
-                        timeout=10
-                    )
-                    
-                    if result.returncode == 0:
-                        terminated_count += 1
-                        self.logger.info(f"TERMINATE: Terminated process matching {process_pattern}")
-                    
-                except Exception as e:
-                    self.logger.warning(f"WARN: Could not terminate {process_pattern}: {e}")
+            if PSUTIL_AVAILABLE:
+                # One sweep of the process table instead of a taskkill spawn per pattern
+                for proc in psutil.process_iter(['name']):
+                    name = (proc.info['name'] or '').lower()
+                    if name.endswith('.exe') and name.startswith(VBS_PROCESS_PREFIXES):
+                        try:
+                            proc.kill()
+                            terminated_count += 1
+                            self.logger.info(f"TERMINATE: Terminated process {proc.info['name']}")
+                        except psutil.Error as e:
+                            self.logger.warning(f"WARN: Could not terminate {proc.info['name']}: {e}")
+            else:
+                for prefix in VBS_PROCESS_PREFIXES:
+                    process_pattern = f"{prefix}*.exe"
+                    try:
+                        result = subprocess.run(
+                            ["taskkill", "/f", "/im", process_pattern],
+                            capture_output=True,
+                            text=True,
+                            timeout=10
+                        )
+                        
+                        if result.returncode == 0:
+                            terminated_count += 1
+                            self.logger.info(f"TERMINATE: Terminated process matching {process_pattern}")
+                        
+                    except Exception as e:
+                        self.logger.warning(f"WARN: Could not terminate {process_pattern}: {e}")
             
             if terminated_count > 0:
                 self.logger.info(f"SUCCESS: Terminated {terminated_count} VBS process(es)")
@@ -502,14 +965,18 @@ class VBSPhase3Complete:
             # STEP 3: Navigate to Excel folder using address bar
             self.logger.info("📋 STEP 3: Navigate to Excel folder")
             try:
-                pyautogui.hotkey('ctrl', 'l')
+                if not self._send_keys(["ctrl+l"]):
+                    raise RuntimeError("address bar shortcut was not injected")
                 time.sleep(0.3)
                 
-                today = datetime.now().strftime("%d%b").lower()
-                excel_path = rf"C:\Users\Lenovo\Documents\Automate2\Automata2\EHC_Data_Merge\{today}"
-                pyautogui.typewrite(excel_path, interval=0.01)
-                time.sleep(0.3)
-                pyautogui.press('enter')
+                # Same folder _find_excel_merge_info resolved - a run that crosses midnight keeps its date
+                excel_path = self.excel_merge_folder
+                # Paste instead of typing - one keystroke, immune to keyboard layout / IME quirks
+                if not self._paste(excel_path):
+                    raise RuntimeError("folder path paste was not injected")
+                time.sleep(0.3)  # let the address bar take the text before ENTER
+                if not self._send_keys(["enter"]):
+                    raise RuntimeError("ENTER after the folder path was not injected")
                 time.sleep(2.0)
                 
                 self.logger.info("✅ Navigated to Excel folder")
@@ -536,25 +1003,32 @@ class VBSPhase3Complete:
                 # Click three dots again if needed
                 if self._click_image("02_three_dots_button.png", required=False):
                     time.sleep(0.3)
-                    pyautogui.press('right')  # Select 'No'
+                    # One batch per UI reaction - the dialog must move focus between these keys
+                    keys_ok = self._send_keys(["right"])   # Select 'No'
                     time.sleep(0.2)
-                    pyautogui.press('enter')  # Confirm
+                    keys_ok &= self._send_keys(["enter"])  # Confirm
                     time.sleep(0.3)
-                    pyautogui.press('tab')    # Get to text field
+                    keys_ok &= self._send_keys(["tab"])    # Get to text field
                     time.sleep(0.2)
-                    pyautogui.typewrite("EHC_Data", interval=0.05)
+                    keys_ok &= self._send_keys(["EHC_Data"])
                     time.sleep(0.3)
                     
-                    self.logger.info("✅ Sheet selection completed")
+                    if keys_ok:
+                        self.logger.info("✅ Sheet selection completed")
+                    else:
+                        self.logger.warning("⚠️ Sheet selection keys were not all injected - sheet name may be wrong")
                     
                     # TAB to highlight import button, then ENTER
                     self.logger.info("🎯 SIMPLE IMPORT STRATEGY: TAB → ENTER")
-                    pyautogui.press('tab')    # This highlights the import button
+                    keys_ok = self._send_keys(["tab"])     # This highlights the import button
                     time.sleep(0.5)
-                    pyautogui.press('enter')  # This clicks the import button
+                    keys_ok &= self._send_keys(["enter"])  # This clicks the import button
                     time.sleep(1.0)
                     
-                    self.logger.info("🎉 IMPORT BUTTON CLICKED via TAB+ENTER strategy!")
+                    if keys_ok:
+                        self.logger.info("🎉 IMPORT BUTTON CLICKED via TAB+ENTER strategy!")
+                    else:
+                        self.logger.warning("⚠️ TAB+ENTER was not fully injected - import may not have started")
                     
             except Exception as e:
                 self.logger.warning(f"Sheet selection failed: {e}")
@@ -565,24 +1039,43 @@ class VBSPhase3Complete:
             
             import_completed = False
             import_start_time = time.time()
+            last_digest = None
+            next_log_at = 60.0
+            poll = 0
             
             while time.time() - import_start_time < 900:  # 15 minutes max
                 elapsed = time.time() - import_start_time
                 
-                # Check for visual popup
+                # Check for visual popup - only when the screen changed since the last poll
                 try:
-                    if self._click_image("08_import_ok_button.png", required=False, timeout=2):
-                        self.logger.info("✅ Import completion popup found!")
-                        import_completed = True
-                        break
-                except:
-                    pass
+                    screen = digest = None
+                    if CV2_AVAILABLE:
+                        self._focus_vbs_only()
+                        screen = self._grab_screen_gray(self._search_region("08_import_ok_button.png"))
+                        digest = self._frame_digest(screen[0])
+                    if digest is None or digest != last_digest:
+                        # Match the very frame that was hashed - a popup painting after the grab
+                        # changes the next digest instead of being skipped as "already checked"
+                        match = self._locate("08_import_ok_button.png", SIMPLE_MIN_CONFIDENCE, screen=screen)
+                        if match:
+                            pyautogui.click(*pyautogui.center(match[1]))
+                            time.sleep(0.5)
+                            self.logger.info("✅ Import completion popup found!")
+                            import_completed = True
+                            break
+                        last_digest = digest  # this frame was checked and holds no popup
+                except Exception as e:
+                    self.logger.debug(f"Import popup check failed: {e}")
                 
                 # Progress logging every 60 seconds
-                if int(elapsed) % 60 == 0 and elapsed > 0:
+                if elapsed >= next_log_at:
                     self.logger.info(f"⏱️ Import wait: {elapsed/60:.1f} minutes elapsed")
+                    next_log_at = (elapsed // 60 + 1) * 60
                 
-                time.sleep(2.0)
+                # Back off 5s, 6s, 7.2s ... up to 30s between polls
+                time.sleep(min(IMPORT_POLL_CAP, IMPORT_POLL_BASE * IMPORT_POLL_FACTOR ** poll,
+                               max(0.0, 900 - (time.time() - import_start_time))))
+                poll += 1
             
             if not import_completed:
                 self.logger.warning("⚠️ Import completion timeout - continuing anyway")
@@ -595,14 +1088,13 @@ class VBSPhase3Complete:
             
             # STEP 8: Click EHC User Detail Header (AFTER import completion - REQUIRED for update button access)
             self.logger.info("📋 STEP 8: EHC User Detail header (AFTER import completion)")
-            if not self._click_image("07_ehc_user_detail_header.png"):
-                # Try the variant 2 header if the first one fails
-                if not self._click_image("07_ehc_user_detail_header2.png"):
-                    self.logger.warning("EHC header click failed - continuing")
-                else:
-                    self.logger.info("✅ EHC header clicked (variant 2)")
+            # Both header variants are scored on the same screenshot each attempt
+            clicked_header = self._click_first_matching(["07_ehc_user_detail_header.png",
+                                                         "07_ehc_user_detail_header2.png"])
+            if clicked_header:
+                self.logger.info(f"✅ EHC header clicked ({clicked_header})")
             else:
-                self.logger.info("✅ EHC header clicked (original)")
+                self.logger.warning("EHC header click failed - continuing")
             steps_completed.append("step_8_ehc_header_after_import")
             time.sleep(0.5)
             
@@ -612,6 +1104,7 @@ class VBSPhase3Complete:
                 # Re-maximize the VBS window since import process may have changed window state
                 win32gui.ShowWindow(self.vbs_window, win32con.SW_MAXIMIZE)
                 time.sleep(1.0)
+                self._vbs_rect = win32gui.GetWindowRect(self.vbs_window)
                 self.logger.info("✅ VBS re-maximized after import")
             except Exception as e:
                 self.logger.warning(f"⚠️ VBS re-maximize failed: {e}")
@@ -619,28 +1112,10 @@ class VBSPhase3Complete:
             # STEP 9: Update Button (direct click - already visible after import)
             self.logger.info("📋 STEP 9: Update button (direct click - EHC header now clicked)")
             
-            # Try to click update button directly - it should be visible after import completion
-            update_success = False
-            
-            # Try multiple times with focus before each attempt
-            for attempt in range(5):
-                self.logger.info(f"🎯 Update button click attempt {attempt + 1}/5")
-                
-                # Ensure VBS is focused
-                self._focus_vbs_only()
-                time.sleep(0.5)
-                
-                # Try to click update button with aggressive retry
-                if self._click_update_button_multiple_images():
-                    self.logger.info("✅ Update button clicked successfully!")
-                    update_success = True
-                    break
-                else:
-                    self.logger.warning(f"⚠️ Update button click attempt {attempt + 1} failed")
-                    time.sleep(2.0)  # Wait before retry
-            
-            if not update_success:
-                return {"success": False, "error": "Step 9 failed - update button not clicked after 5 attempts"}
+            # One call - the method retries the image match itself and ends with the keyboard shortcut
+            if not self._click_update_button_multiple_images():
+                return {"success": False, "error": "Step 9 failed - update button not clicked"}
+            self.logger.info("✅ Update button clicked successfully!")
             
             self.logger.info("🎉 Update process started successfully!")
             steps_completed.append("step_9_update_started")
@@ -667,13 +1142,14 @@ class VBSPhase3Complete:
             time.sleep(15.0)
             
             # Close using Alt+F4
-            pyautogui.hotkey('alt', 'f4')
+            if not self._send_keys(["alt+f4"]):
+                self.logger.warning("⚠️ Alt+F4 was not injected - relying on process termination")
             time.sleep(1.0)
             
             # Handle any close confirmation dialogs
-            pyautogui.press('enter')  # Accept close
+            self._send_keys(["enter"])  # Accept close
             time.sleep(0.5)
-            pyautogui.press('enter')  # In case there's another dialog
+            self._send_keys(["enter"])  # In case there's another dialog
             time.sleep(1.0)
             
             # Force terminate VBS processes
@@ -702,6 +1178,9 @@ class VBSPhase3Complete:
         except Exception as e:
             self.logger.error(f"❌ Phase 3 failed: {e}")
             return {"success": False, "error": str(e), "steps_completed": steps_completed}
+        
+        finally:
+            self.close()
 
     def _navigate_to_ehc_section_keyboard(self):
         """Navigate to EHC User Detail section using keyboard - RELIABLE METHOD"""
@@ -749,12 +1228,65 @@ class VBSPhase3Complete:
     def _verify_update_button_visible(self):
         """Verify that the update button is now visible (indicates EHC section is expanded)"""
         try:
-            update_image_path = self.images_dir / "09_update_button.png"
-            location = pyautogui.locateOnScreen(str(update_image_path), confidence=0.7)
-            return location is not None
+            return self._locate("09_update_button.png", 0.7) is not None
         except:
             return False
 
+    def _start_vbs_window_watch(self, wake):
+        """Hook window creation in the VBS process on a pump thread - returns its thread id (None if unavailable)
+        
+        wake is set whenever VBS creates or shows a top-level window; post WM_QUIT to the thread to unhook.
+        """
+        user32 = ctypes.WinDLL("user32", use_last_error=True)
+        user32.SetWinEventHook.restype = wintypes.HANDLE
+        user32.SetWinEventHook.argtypes = (wintypes.DWORD, wintypes.DWORD, wintypes.HMODULE, WINEVENTPROC,
+                                           wintypes.DWORD, wintypes.DWORD, wintypes.DWORD)
+        user32.UnhookWinEvent.argtypes = (wintypes.HANDLE,)
+        user32.GetAncestor.restype = wintypes.HWND
+        user32.GetAncestor.argtypes = (wintypes.HWND, wintypes.UINT)
+        
+        pid = wintypes.DWORD()
+        user32.GetWindowThreadProcessId(self.vbs_window, ctypes.byref(pid))
+        
+        def on_event(hook, event, hwnd, id_object, id_child, event_thread, event_time):
+            # The hooked range also delivers EVENT_OBJECT_DESTROY - a window going away is no popup
+            if event == EVENT_OBJECT_DESTROY:
+                return
+            if hwnd and id_object == OBJID_WINDOW and user32.GetAncestor(hwnd, GA_ROOT) == hwnd:
+                wake.set()
+        
+        callback = WINEVENTPROC(on_event)
+        started = threading.Event()
+        state = {}
+        
+        def pump():
+            hook = None
+            try:
+                state["thread_id"] = ctypes.windll.kernel32.GetCurrentThreadId()
+                hook = user32.SetWinEventHook(EVENT_OBJECT_CREATE, EVENT_OBJECT_SHOW, None, callback,
+                                              pid.value, 0, WINEVENT_OUTOFCONTEXT)
+                state["hooked"] = bool(hook)
+            finally:
+                started.set()
+            if not hook:
+                return
+            
+            # Out-of-context hooks are delivered through this thread's message queue
+            msg = wintypes.MSG()
+            try:
+                while user32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+                    user32.TranslateMessage(ctypes.byref(msg))
+                    user32.DispatchMessageW(ctypes.byref(msg))
+            finally:
+                user32.UnhookWinEvent(hook)
+        
+        threading.Thread(target=pump, name="VBSWindowWatch", daemon=True).start()
+        started.wait(2.0)
+        if not state.get("hooked"):
+            self.logger.warning(f"⚠️ WinEvent hook unavailable - polling every {UPLOAD_POLL_FALLBACK:.0f}s instead")
+            return None
+        return state["thread_id"]
+    
     def _wait_for_upload_completion_with_popup(self):
         """Wait for upload completion with enhanced popup detection (3 hours)"""
         self.logger.info("⏳ Waiting for upload completion with popup detection (3 hours)")
@@ -764,26 +1296,48 @@ class VBSPhase3Complete:
         start_time = time.time()
         exact_wait = 10800.0  # EXACTLY 3 hours (3 * 60 * 60 = 10,800 seconds)
         upload_completed = False
+        next_log_at = UPLOAD_LOG_INTERVAL
         
-        while time.time() - start_time < exact_wait:
-            elapsed = time.time() - start_time
-            hours = int(elapsed / 3600)
-            minutes = int((elapsed % 3600) / 60)
-            remaining_seconds = exact_wait - elapsed
-            remaining_hours = int(remaining_seconds / 3600)
-            remaining_minutes = int((remaining_seconds % 3600) / 60)
-            
-            # Check for upload success popup using the new image
-            if self._check_for_upload_popup():
-                self.logger.info(f"🎉 Upload completion popup detected at {hours}h {minutes}m!")
-                upload_completed = True
-                break
-            
-            # Progress logging every 15 minutes for 3-hour wait
-            if int(elapsed) % 900 == 0 and elapsed > 0:
-                self.logger.info(f"⏱️ Upload progress: {hours}h {minutes}m elapsed | {remaining_hours}h {remaining_minutes}m remaining")
-            
-            time.sleep(5.0)  # Check every 5 seconds
+        # Block until VBS shows a new window (or the next progress log / slow poll is due) instead of polling
+        wake = threading.Event()
+        watch_thread = self._start_vbs_window_watch(wake)
+        rechecks = []  # pending backoff delays after a wake
+        
+        try:
+            while time.time() - start_time < exact_wait:
+                elapsed = time.time() - start_time
+                hours = int(elapsed / 3600)
+                minutes = int((elapsed % 3600) / 60)
+                remaining_seconds = exact_wait - elapsed
+                remaining_hours = int(remaining_seconds / 3600)
+                remaining_minutes = int((remaining_seconds % 3600) / 60)
+                
+                # Check for upload success popup using the new image
+                if self._check_for_upload_popup():
+                    self.logger.info(f"🎉 Upload completion popup detected at {hours}h {minutes}m!")
+                    upload_completed = True
+                    break
+                
+                # Progress logging every 15 minutes for 3-hour wait
+                if elapsed >= next_log_at:
+                    self.logger.info(f"⏱️ Upload progress: {hours}h {minutes}m elapsed | {remaining_hours}h {remaining_minutes}m remaining")
+                    next_log_at = (elapsed // UPLOAD_LOG_INTERVAL + 1) * UPLOAD_LOG_INTERVAL
+                
+                if watch_thread is None:
+                    time.sleep(UPLOAD_POLL_FALLBACK)
+                    continue
+                
+                if rechecks:
+                    time.sleep(rechecks.pop(0))
+                    continue
+                
+                if wake.wait(max(0.0, min(next_log_at, elapsed + UPLOAD_SLOW_POLL, exact_wait) - elapsed)):
+                    wake.clear()
+                    rechecks = list(UPLOAD_POPUP_RECHECKS)
+                    time.sleep(rechecks.pop(0))  # let the new window paint before matching it
+        finally:
+            if watch_thread is not None:
+                ctypes.windll.user32.PostThreadMessageW(watch_thread, win32con.WM_QUIT, 0, 0)
         
         if not upload_completed:
             self.logger.info("⏰ EXACTLY 3 HOURS COMPLETED - Auto-detecting completion")
@@ -799,10 +1353,8 @@ class VBSPhase3Complete:
         """Check for upload success popup using the new image"""
         try:
             # Check for the upload success OK button (USER PROVIDED IMAGE)
-            popup_image_path = self.images_dir / "09_update_success_ok_button.png"
-            if popup_image_path.exists():
-                location = pyautogui.locateOnScreen(str(popup_image_path), confidence=0.8)
-                if location:
+            if "09_update_success_ok_button.png" in self._image_paths:
+                if self._locate("09_update_success_ok_button.png", 0.8):
                     self.logger.info("🔔 Upload success popup detected via 09_update_success_ok_button.png!")
                     return True
             else:
@@ -844,12 +1396,11 @@ class VBSPhase3Complete:
         
         try:
             # First try to click the OK button using the new image
-            popup_image_path = self.images_dir / "09_update_success_ok_button.png"
-            if popup_image_path.exists():
+            if "09_update_success_ok_button.png" in self._image_paths:
                 try:
-                    location = pyautogui.locateOnScreen(str(popup_image_path), confidence=0.8)
-                    if location:
-                        click_x, click_y = pyautogui.center(location)
+                    match = self._locate("09_update_success_ok_button.png", 0.8)
+                    if match:
+                        click_x, click_y = pyautogui.center(match[1])
                         pyautogui.click(click_x, click_y)
                         time.sleep(1.0)
                         self.logger.info("✅ Upload success popup dismissed via OK button click")